@@ -0,0 +1,239 @@
+"""
+Micro-benchmarks for the heuristic agents and text helpers.
+
+    python benchmarks/bench_agents.py                       # table on stdout
+    python benchmarks/bench_agents.py -o bench.json         # + machine-readable results
+    python benchmarks/bench_agents.py --compare base.json   # ratio against an earlier run
+
+Corpora are generated from a fixed seed (short ~80 B, medium ~4 KB, long
+~120 KB per decision), so runs on different commits see identical input.
+Each function is measured in two modes:
+- cold: the analyze_text memo is cleared before every call (a decision the
+  process has not seen yet)
+- warm: the same decision again (the memo and template caches are hot)
+Latency percentiles come from per-call perf_counter_ns samples; allocations
+are measured in a separate tracemalloc pass so they don't skew the timings.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tracemalloc
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from disagree import text as text_module
+from disagree.text import KEYWORD_GROUPS, contains_any, count_numbers
+from disagree.agents import (
+    intent_decoder,
+    bias_detector,
+    confidence_score,
+    counterargument_generator,
+    second_order_impacts,
+    derisk_recommendations,
+)
+
+SEED = 20240601
+CORPUS_SIZES = {"short": 80, "medium": 4_000, "long": 120_000}
+CORPUS_DOCS = 16
+LEVEL = 4
+
+FILLER = (
+    "the team plans to review the roadmap with finance and ops before the next quarter "
+    "customers asked for better onboarding and the pilot showed mixed adoption "
+    "we will hire two engineers and migrate the billing service to the new platform "
+).split()
+NUMBERS = ["3", "12", "$500k", "40%", "2025", "1.5", "90"]
+KEYWORDS = [phrase for phrases in KEYWORD_GROUPS.values() for phrase in phrases]
+
+def make_text(rng, size):
+    words = []
+    length = 0
+    while length < size:
+        roll = rng.random()
+        if roll < 0.04:
+            word = rng.choice(KEYWORDS)
+        elif roll < 0.07:
+            word = rng.choice(NUMBERS)
+        else:
+            word = rng.choice(FILLER)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:size]
+
+def make_corpora(seed=SEED):
+    rng = random.Random(seed)
+    return {
+        name: [(make_text(rng, size), make_text(rng, size // 4)) for _ in range(CORPUS_DOCS)]
+        for name, size in CORPUS_SIZES.items()
+    }
+
+# name -> (setup(decision, context) -> args, function, uses corpus text)
+CASES = {
+    "intent_decoder": (lambda d, c: (d, c), intent_decoder, True),
+    "bias_detector": (lambda d, c: (intent_decoder(d, c),), bias_detector, True),
+    "confidence_score": (lambda d, c: (d, c), confidence_score, True),
+    "counterargument_generator": (lambda d, c: (intent_decoder(d, c), LEVEL), counterargument_generator, True),
+    "second_order_impacts": (lambda d, c: (intent_decoder(d, c), LEVEL), second_order_impacts, True),
+    "derisk_recommendations": (lambda d, c: (LEVEL,), derisk_recommendations, False),
+    "count_numbers": (lambda d, c: (d,), count_numbers, True),
+    "contains_any": (lambda d, c: (d, KEYWORD_GROUPS["urgency"]), contains_any, True),
+}
+
+def clear_memo():
+    text_module._analyze_text.cache_clear()
+
+def percentile(sorted_samples, q):
+    if not sorted_samples:
+        return 0
+    index = min(len(sorted_samples) - 1, max(0, round(q / 100 * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+def time_calls(fn, arg_sets, cold, min_time, max_calls):
+    samples = []
+    clock = time.perf_counter_ns
+    budget = min_time * 1e9
+    spent = 0
+    i = 0
+    while (spent < budget or len(samples) < 5) and len(samples) < max_calls:
+        args = arg_sets[i % len(arg_sets)]
+        i += 1
+        if cold:
+            clear_memo()
+        start = clock()
+        fn(*args)
+        elapsed = clock() - start
+        samples.append(elapsed)
+        spent += elapsed
+    return samples
+
+def measure_allocations(fn, arg_sets, cold, calls=20):
+    peaks, retained = [], []
+    tracemalloc.start()
+    try:
+        for i in range(calls):
+            args = arg_sets[i % len(arg_sets)]
+            if cold:
+                clear_memo()
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            fn(*args)
+            after, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            retained.append(after - before)
+    finally:
+        tracemalloc.stop()
+    return {"peak_bytes": max(peaks), "mean_peak_bytes": round(sum(peaks) / len(peaks)), "mean_retained_bytes": round(sum(retained) / len(retained))}
+
+def run_case(name, corpus_name, docs, mode, min_time, max_calls):
+    setup, fn, _ = CASES[name]
+    cold = mode == "cold"
+    arg_sets = [setup(d, c) for d, c in docs]
+    if not cold:
+        for args in arg_sets:
+            fn(*args)
+    samples = time_calls(fn, arg_sets, cold, min_time, max_calls)
+    total = sum(samples)
+    samples.sort()
+    return {
+        "function": name,
+        "corpus": corpus_name,
+        "mode": mode,
+        "calls": len(samples),
+        "ops_per_sec": round(len(samples) / (total / 1e9), 1) if total else None,
+        "latency_ns": {
+            "mean": round(total / len(samples)),
+            "p50": percentile(samples, 50),
+            "p90": percentile(samples, 90),
+            "p99": percentile(samples, 99),
+            "max": samples[-1],
+        },
+        "alloc": measure_allocations(fn, arg_sets, cold),
+    }
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def run(functions, corpora_names, modes, min_time, max_calls):
+    corpora = make_corpora()
+    results = []
+    for name in functions:
+        uses_text = CASES[name][2]
+        for corpus_name in (corpora_names if uses_text else corpora_names[:1]):
+            for mode in modes:
+                result = run_case(name, corpus_name if uses_text else "-", corpora[corpus_name], mode, min_time, max_calls)
+                results.append(result)
+                print(format_row(result), file=sys.stderr)
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "seed": SEED,
+            "corpus_bytes": CORPUS_SIZES,
+            "level": LEVEL,
+            "min_time": min_time,
+        },
+        "results": results,
+    }
+
+def format_ns(ns):
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:.2f}{unit}"
+    return f"{ns}ns"
+
+def format_row(r):
+    lat = r["latency_ns"]
+    return (f"{r['function']:<26} {r['corpus']:<7} {r['mode']:<5} "
+            f"{r['ops_per_sec']:>12,.0f} ops/s  p50 {format_ns(lat['p50']):>9}  p99 {format_ns(lat['p99']):>9}  "
+            f"peak {r['alloc']['peak_bytes']:>9,} B")
+
+def compare(current, baseline):
+    """Prints current/baseline p50 ratios; > 1 means slower than the baseline."""
+    key = lambda r: (r["function"], r["corpus"], r["mode"])
+    base = {key(r): r for r in baseline["results"]}
+    print(f"vs {baseline['meta'].get('commit') or 'baseline'} (p50 ratio, >1 is slower)")
+    for r in current["results"]:
+        old = base.get(key(r))
+        if old is None:
+            continue
+        ratio = r["latency_ns"]["p50"] / max(1, old["latency_ns"]["p50"])
+        flag = "  <-- slower" if ratio > 1.10 else ""
+        print(f"{r['function']:<26} {r['corpus']:<7} {r['mode']:<5} {ratio:6.2f}x{flag}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the disagree agents.")
+    parser.add_argument("-o", "--output", help="write JSON results here ('-' for stdout)")
+    parser.add_argument("--compare", metavar="JSON", help="an earlier -o file to compare against")
+    parser.add_argument("--functions", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--corpora", nargs="+", choices=list(CORPUS_SIZES), default=list(CORPUS_SIZES))
+    parser.add_argument("--modes", nargs="+", choices=("cold", "warm"), default=["cold", "warm"])
+    parser.add_argument("--min-time", type=float, default=0.3, help="seconds of timed calls per case (default 0.3)")
+    parser.add_argument("--max-calls", type=int, default=200_000)
+    args = parser.parse_args(argv)
+
+    report = run(args.functions, args.corpora, args.modes, args.min_time, args.max_calls)
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            json.dump(report, fp, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fp:
+            compare(report, json.load(fp))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
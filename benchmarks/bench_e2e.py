@@ -0,0 +1,177 @@
+"""
+End-to-end latency of the OpenAI path against the local fake server.
+
+    python benchmarks/bench_e2e.py --concurrency 1 8 32 --requests 200 --error-rate 0.02 --malformed-rate 0.05
+    python benchmarks/bench_e2e.py --path stream --latency fixed:0.3 --token-rate 60 -o e2e.json
+    python benchmarks/bench_e2e.py --base-url http://127.0.0.1:8089/v1   # an already-running fake_openai.py
+
+Decisions are replayed through one of:
+- analyze:  disagree.analyze(mode="openai"), i.e. the deadline race and template fallback
+- one_call: llm.openai_one_call, the bare blocking call (failures are counted, not replaced)
+- stream:   disagree.analyze_stream, also reporting time to the first LLM item
+- levels:   disagree.analyze_levels(mode="openai"), one request for all five levels
+For each concurrency level it reports throughput, p50/p95/p99 latency and how
+often (and why) the result fell back to templates. The response cache is off
+unless --cache is given, so every request reaches the server.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import collections
+import concurrent.futures
+
+from bench_agents import make_text, percentile
+from fake_openai import add_behavior_args, behavior_from_args, start
+
+PATHS = ("analyze", "one_call", "stream", "levels")
+
+def make_decisions(n, seed=7):
+    rng = random.Random(seed)
+    return [(make_text(rng, rng.choice((80, 300, 1200))), make_text(rng, 120), rng.randint(1, 5)) for _ in range(n)]
+
+def classify(error):
+    if error is None:
+        return None
+    if "did not answer within" in error:
+        return "deadline"
+    if "JSON" in error:
+        return "malformed"
+    return "error"
+
+def make_runner(path, deadline):
+    # Imported after the environment is set up: disagree.llm reads it at import time.
+    import disagree
+    from disagree import llm
+
+    def run_analyze(decision, context, level):
+        result = disagree.analyze(decision, context, level=level, mode="openai", deadline=deadline)
+        return classify(result.llm_error), None
+
+    def run_one_call(decision, context, level):
+        intent = disagree.intent_decoder(decision, context)
+        try:
+            llm.openai_one_call(intent, level)
+        except Exception as e:
+            return classify(str(e)) or "error", None
+        return None, None
+
+    def run_stream(decision, context, level):
+        start = time.perf_counter()
+        first = None
+        for event, payload in disagree.analyze_stream(decision, context, level):
+            if first is None and event not in ("template", "done"):
+                first = time.perf_counter() - start
+            if event == "done":
+                return classify(payload.llm_error), first
+
+    def run_levels(decision, context, level):
+        results = disagree.analyze_levels(decision, context, mode="openai", deadline=deadline)
+        return classify(next((r.llm_error for r in results.values() if r.llm_error), None)), None
+
+    return {"analyze": run_analyze, "one_call": run_one_call, "stream": run_stream, "levels": run_levels}[path]
+
+def run_level(runner, decisions, concurrency):
+    def timed(item):
+        start = time.perf_counter()
+        fallback, first = runner(*item)
+        return time.perf_counter() - start, fallback, first
+
+    started = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(timed, decisions))
+    wall = time.perf_counter() - started
+
+    latencies = sorted(o[0] for o in outcomes)
+    firsts = sorted(o[2] for o in outcomes if o[2] is not None)
+    reasons = collections.Counter(o[1] for o in outcomes if o[1] is not None)
+    report = {
+        "concurrency": concurrency,
+        "requests": len(outcomes),
+        "throughput_rps": round(len(outcomes) / wall, 2),
+        "latency_s": {q: round(percentile(latencies, int(q[1:])), 4) for q in ("p50", "p95", "p99")},
+        "fallback_rate": round(sum(reasons.values()) / len(outcomes), 4),
+        "fallback_reasons": dict(reasons),
+    }
+    if firsts:
+        report["first_item_s"] = {q: round(percentile(firsts, int(q[1:])), 4) for q in ("p50", "p95", "p99")}
+    return report
+
+def format_level(r):
+    lat = r["latency_s"]
+    line = (f"c={r['concurrency']:<4} {r['throughput_rps']:>8.1f} req/s  "
+            f"p50 {lat['p50']:.3f}s  p95 {lat['p95']:.3f}s  p99 {lat['p99']:.3f}s  "
+            f"fallback {r['fallback_rate']:.1%} {r['fallback_reasons'] or ''}")
+    if "first_item_s" in r:
+        line += f"  first item p50 {r['first_item_s']['p50']:.3f}s"
+    return line
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end OpenAI-path benchmark against a fake server.")
+    parser.add_argument("--base-url", help="use a running server instead of starting fake_openai in-process")
+    parser.add_argument("--path", choices=PATHS, default="analyze")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests", type=int, default=100, help="requests per concurrency level")
+    parser.add_argument("--deadline", type=float, default=None, help="analyze and levels paths (default DISAGREE_LLM_DEADLINE / LEVELS_DEADLINE)")
+    parser.add_argument("--cache", action="store_true", help="leave the response cache on")
+    parser.add_argument("-o", "--output", help="write JSON results here ('-' for stdout)")
+    add_behavior_args(parser)
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.base_url:
+        base_url = args.base_url
+    else:
+        server = start(behavior_from_args(args))
+        base_url = server.base_url
+
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "fake-key")
+    os.environ.setdefault("OPENAI_MAX_CONNECTIONS", str(max(args.concurrency)))
+    os.environ.setdefault("OPENAI_KEEPALIVE_CONNECTIONS", str(max(args.concurrency)))
+    if not args.cache:
+        os.environ["DISAGREE_LLM_CACHE_SIZE"] = "0"
+        os.environ["DISAGREE_LLM_CACHE_DB"] = ""
+
+    runner = make_runner(args.path, args.deadline)
+    levels = []
+    try:
+        for concurrency in args.concurrency:
+            # Fresh decisions per level so a left-on cache can't skew the comparison.
+            result = run_level(runner, make_decisions(args.requests, seed=concurrency), concurrency)
+            levels.append(result)
+            print(format_level(result), file=sys.stderr)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    report = {
+        "meta": {
+            "path": args.path,
+            "base_url": base_url,
+            "fake_server": None if args.base_url else {
+                "latency": args.latency,
+                "token_rate": args.token_rate,
+                "malformed_rate": args.malformed_rate,
+                "prose_rate": args.prose_rate,
+                "error_rate": args.error_rate,
+                "seed": args.seed,
+            },
+            "deadline": args.deadline,
+            "max_connections": int(os.environ["OPENAI_MAX_CONNECTIONS"]),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "levels": levels,
+    }
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            json.dump(report, fp, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
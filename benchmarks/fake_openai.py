@@ -0,0 +1,226 @@
+"""
+Local stand-in for the OpenAI chat completions API (stdlib only).
+
+    python benchmarks/fake_openai.py --port 8089 --latency lognormal:0.6,0.4 --token-rate 80 --error-rate 0.02
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=fake python -m disagree "Ship it ASAP" --mode openai
+
+Answers POST /v1/chat/completions with a JSON answer in the schema the app
+asks for (item counts follow the requested intensity; an all-levels prompt
+gets one object per level, keyed "1".."5"), streamed as SSE chunks when
+"stream": true. Behaviour knobs:
+- latency: time to first byte, drawn per request (fixed:S, uniform:A,B,
+  normal:MEAN,SD, lognormal:MEDIAN,SIGMA, exp:MEAN)
+- token rate: tokens per second after the first byte (0 = all at once)
+- malformed rate: answer cut off mid-object (unparseable)
+- prose rate: valid object wrapped in chatty prose (needs salvage)
+- error rate: 429 / 500 / 503 with an OpenAI-style error body
+"""
+import re
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+def parse_distribution(spec):
+    """'lognormal:0.6,0.4' -> callable(rng) returning seconds (never negative)."""
+    kind, _, params = spec.partition(":")
+    args = [float(p) for p in params.split(",") if p]
+    draw = {
+        "fixed": lambda rng: args[0],
+        "uniform": lambda rng: rng.uniform(args[0], args[1]),
+        "normal": lambda rng: rng.gauss(args[0], args[1]),
+        "lognormal": lambda rng: rng.lognormvariate(math.log(args[0]), args[1]),
+        "exp": lambda rng: rng.expovariate(1 / args[0]) if args[0] else 0.0,
+    }.get(kind)
+    if draw is None:
+        raise ValueError(f"unknown latency distribution {spec!r}")
+    return lambda rng: max(0.0, draw(rng))
+
+class Behavior:
+    def __init__(self, latency="fixed:0", token_rate=0.0, malformed_rate=0.0, prose_rate=0.0, error_rate=0.0, seed=None):
+        self.latency_spec = latency
+        self.latency = parse_distribution(latency)
+        self.token_rate = token_rate
+        self.malformed_rate = malformed_rate
+        self.prose_rate = prose_rate
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    def draw(self):
+        """Per-request decisions, drawn under a lock so a seeded run is reproducible per arrival order."""
+        with self._lock:
+            self.requests += 1
+            rng = random.Random(self.rng.random())
+        return {
+            "rng": rng,
+            "latency": self.latency(rng),
+            "error": rng.random() < self.error_rate,
+            "malformed": rng.random() < self.malformed_rate,
+            "prose": rng.random() < self.prose_rate,
+        }
+
+WORDS = ("timeline risk budget adoption pilot rollout vendor capacity churn margin "
+         "dependency assumption stakeholder approval migration forecast runway hiring").split()
+LEVEL_RE = re.compile(r"Disagreement intensity: (\d)/5")
+ALL_LEVELS_RE = re.compile(r"Answer once for EACH disagreement intensity level")
+TOKEN_RE = re.compile(r"\S+\s*|\s+")
+
+def _sentence(rng):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(8, 16))]
+    return " ".join(words).capitalize() + "."
+
+def _level_answer(level, rng):
+    return {
+        "counterarguments": [_sentence(rng) for _ in range(level + 1)],
+        "impacts": [_sentence(rng) for _ in range(4 if level < 4 else 5)],
+        "recommendations": [_sentence(rng) for _ in range(3 if level <= 3 else 4)],
+    }
+
+def answer_text(prompt, draw):
+    rng = draw["rng"]
+    if ALL_LEVELS_RE.search(prompt):
+        answer = {str(level): _level_answer(level, rng) for level in range(1, 6)}
+    else:
+        match = LEVEL_RE.search(prompt)
+        answer = _level_answer(int(match.group(1)) if match else 3, rng)
+    text = json.dumps(answer, indent=2)
+    if draw["malformed"]:
+        text = text[: rng.randint(1, len(text) - 2)]
+    if draw["prose"]:
+        text = f"Sure! Here is the analysis you asked for:\n{text}\nLet me know if you need more detail."
+    return text
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if self.path.rstrip("/") not in ("/v1/chat/completions", "/chat/completions"):
+            return self.send_json(404, {"error": {"message": "not found", "type": "invalid_request_error"}})
+        body = json.loads(self.rfile.read(int(self.headers.get("content-length") or 0)) or b"{}")
+        behavior = self.server.behavior
+        draw = behavior.draw()
+        time.sleep(draw["latency"])
+
+        if draw["error"]:
+            status = draw["rng"].choice((429, 500, 503))
+            return self.send_json(status, {"error": {"message": f"fake upstream error {status}", "type": "server_error"}})
+
+        prompt = "".join(m.get("content") or "" for m in body.get("messages", []))
+        text = answer_text(prompt, draw)
+        tokens = TOKEN_RE.findall(text)
+        usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(tokens), "total_tokens": len(prompt) // 4 + len(tokens)}
+        ident = f"chatcmpl-fake{behavior.requests}"
+        model = body.get("model", "fake")
+
+        if not body.get("stream"):
+            if behavior.token_rate:
+                time.sleep(len(tokens) / behavior.token_rate)
+            return self.send_json(200, {
+                "id": ident,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+
+        self.send_response(200)
+        self.send_header("content-type", "text/event-stream")
+        self.send_header("transfer-encoding", "chunked")
+        self.end_headers()
+
+        def chunk(delta, finish=None, **extra):
+            self.write_event({
+                "id": ident,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+                **extra,
+            })
+
+        try:
+            chunk({"role": "assistant", "content": ""})
+            for token in tokens:
+                if behavior.token_rate:
+                    time.sleep(1 / behavior.token_rate)
+                chunk({"content": token})
+            chunk({}, "stop")
+            if (body.get("stream_options") or {}).get("include_usage"):
+                self.write_event({"id": ident, "object": "chat.completion.chunk", "model": model, "choices": [], "usage": usage})
+            self.write_chunk(b"data: [DONE]\n\n")
+            self.write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # client cancelled mid-stream
+
+    def write_event(self, payload):
+        self.write_chunk(b"data: " + json.dumps(payload).encode() + b"\n\n")
+
+    def write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def send_json(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address, behavior):
+        super().__init__(address, Handler)
+        self.behavior = behavior
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+def start(behavior, host="127.0.0.1", port=0):
+    """Serves on a daemon thread; returns the server (see .base_url, .shutdown())."""
+    server = FakeOpenAIServer((host, port), behavior)
+    threading.Thread(target=server.serve_forever, name="fake-openai", daemon=True).start()
+    return server
+
+def add_behavior_args(parser):
+    parser.add_argument("--latency", default="lognormal:0.5,0.5", help="time-to-first-byte distribution (default lognormal:0.5,0.5)")
+    parser.add_argument("--token-rate", type=float, default=150.0, help="tokens per second after the first byte (0 = instant)")
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--prose-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1)
+
+def behavior_from_args(args):
+    return Behavior(args.latency, args.token_rate, args.malformed_rate, args.prose_rate, args.error_rate, args.seed)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fake OpenAI chat completions server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    add_behavior_args(parser)
+    args = parser.parse_args(argv)
+
+    server = FakeOpenAIServer((args.host, args.port), behavior_from_args(args))
+    print(f"OPENAI_BASE_URL={server.base_url}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
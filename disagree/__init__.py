@@ -0,0 +1,34 @@
+"""
+Disagreement engine: heuristic agents plus the optional single-call LLM path.
+Importing this package never imports Streamlit or openai.
+"""
+from .text import AnalyzedText, analyze_text, keyword_hits, contains_any, count_numbers
+from .agents import (
+    intent_decoder,
+    bias_detector,
+    confidence_score,
+    counterargument_generator,
+    second_order_impacts,
+    derisk_recommendations,
+)
+from .engine import Result, analyze, analyze_async, analyze_levels, analyze_stream, analyze_stream_async
+
+__all__ = [
+    "AnalyzedText",
+    "analyze_text",
+    "keyword_hits",
+    "contains_any",
+    "count_numbers",
+    "intent_decoder",
+    "bias_detector",
+    "confidence_score",
+    "counterargument_generator",
+    "second_order_impacts",
+    "derisk_recommendations",
+    "Result",
+    "analyze",
+    "analyze_async",
+    "analyze_levels",
+    "analyze_stream",
+    "analyze_stream_async",
+]
@@ -0,0 +1,214 @@
+"""
+Heuristic agents (POC). Pure functions over AnalyzedText; no UI, no network.
+
+Each agent is a thin wrapper over a *_from_mask projection of the keyword-group
+bitmask (see GROUP_BITS), so batch code can run the same rules straight off a
+feature matrix without re-reading the text.
+"""
+import re
+import functools
+
+from .text import GROUP_BITS as BIT, KEYWORD_GROUPS, analyze_text, keyword_mask
+
+def clamp(n, lo, hi):
+    return max(lo, min(hi, n))
+
+# -----------------------------
+# Agent 1: Intent Decoder (POC heuristic)
+# -----------------------------
+TIMEFRAME_RE = re.compile(r"\b(in|within|over)\s+(\d+)\s+(day|days|week|weeks|month|months|quarter|quarters|year|years)\b")
+
+def intent_decoder(decision_text, context=""):
+    doc = analyze_text(decision_text)
+    ctx = analyze_text(context)
+
+    timeframe = "Not specified"
+    m = TIMEFRAME_RE.search(doc.text)
+    if m:
+        timeframe = f"{m.group(2)} {m.group(3)}"
+
+    return {
+        "decision": doc.raw,
+        "context": ctx.raw,
+        "timeframe": timeframe,
+        "signals": signals_from_mask(doc.mask),
+    }
+
+def signals_from_mask(mask):
+    return {
+        "urgency": bool(mask & BIT["urgency"]),
+        "scale": bool(mask & BIT["scale"]),
+        "certainty": bool(mask & BIT["certainty"]),
+    }
+
+# -----------------------------
+# Agent 2: Bias Detector (POC heuristic)
+# -----------------------------
+def bias_detector(intent):
+    return biases_from_mask(analyze_text(intent["decision"]).mask)
+
+def biases_from_mask(mask):
+    flags = []
+
+    if mask & BIT["certainty"]:
+        flags.append("Overconfidence bias")
+    if mask & BIT["groupthink"]:
+        flags.append("Social proof / groupthink")
+    if mask & BIT["haste"]:
+        flags.append("Optimism / planning fallacy")
+    if mask & BIT["sunk_cost"]:
+        flags.append("Sunk cost fallacy")
+
+    if not flags:
+        flags.append("No strong bias detected (based on visible signals)")
+
+    return flags
+
+# -----------------------------
+# Confidence Score (POC heuristic)
+# -----------------------------
+# The score reads decision and context as one text, so an evidence or
+# risk-denial phrase split across the two ("... with zero" + "risk ...") counts.
+JOIN_BITS = BIT["evidence"] | BIT["risk_denial"]
+
+# The rule, shared with vectorized.py: a base, capped points per number, then a
+# weight for each flag that is set (in this order).
+BASE_SCORE = 75
+NUMBER_WEIGHT, NUMBER_CAP = 4, 20
+SHORT_DECISION_CHARS, SHORT_CONTEXT_CHARS = 40, 20
+FLAG_WEIGHTS = {"evidence": 10, "risk_denial": -15, "short_decision": -10, "short_context": -5}
+_JOIN_WINDOW = max(len(k) for group in ("evidence", "risk_denial") for k in KEYWORD_GROUPS[group])
+
+def join_mask(doc, ctx):
+    """JOIN_BITS matched in decision + " " + context around the join (AnalyzedText inputs)."""
+    if not doc.text or not ctx.text:
+        return 0
+    return keyword_mask(doc.text[-_JOIN_WINDOW:] + " " + ctx.text[:_JOIN_WINDOW]) & JOIN_BITS
+
+def confidence_score(decision_text, context_text):
+    doc = analyze_text(decision_text)
+    ctx = analyze_text(context_text)
+    return confidence_from_features(
+        doc.mask | ctx.mask | join_mask(doc, ctx),
+        len(doc.numbers) + len(ctx.numbers),
+        len(doc.raw),
+        len(ctx.raw),
+    )
+
+def confidence_from_features(mask, nums, decision_len, context_len):
+    score = BASE_SCORE
+    score += clamp(nums * NUMBER_WEIGHT, 0, NUMBER_CAP)
+
+    if mask & BIT["evidence"]:
+        score += FLAG_WEIGHTS["evidence"]
+
+    if mask & BIT["risk_denial"]:
+        score += FLAG_WEIGHTS["risk_denial"]
+
+    if decision_len < SHORT_DECISION_CHARS:
+        score += FLAG_WEIGHTS["short_decision"]
+    if context_len < SHORT_CONTEXT_CHARS:
+        score += FLAG_WEIGHTS["short_context"]
+
+    return clamp(score, 0, 100)
+
+# -----------------------------
+# Template mode (no LLM)
+# -----------------------------
+# Template outputs depend only on these bits and the level, so they are
+# memoized on (masked bits, level): at most 2^8 x 5 entries, filled on first use.
+COUNTER_BITS = BIT["launch"] | BIT["scale"] | BIT["urgency"] | BIT["spend"] | BIT["certainty"]
+COUNTER_CONTEXT_BITS = BIT["budget"]
+IMPACT_BITS = BIT["delivery"] | BIT["integration"]
+
+def counterargument_generator(intent, disagree_level):
+    return counterarguments_from_mask(
+        analyze_text(intent["decision"]).mask,
+        analyze_text(intent["context"]).mask,
+        disagree_level,
+    )
+
+def counterarguments_from_mask(mask, context_mask, disagree_level):
+    return list(_counterarguments(mask & COUNTER_BITS, context_mask & COUNTER_CONTEXT_BITS, disagree_level))
+
+@functools.cache
+def _counterarguments(mask, context_mask, disagree_level):
+    counters = []
+
+    if mask & BIT["launch"]:
+        counters.append("Launching on an aggressive timeline increases execution risk and reduces time for validation.")
+    if mask & BIT["scale"]:
+        counters.append("Scaling before validating assumptions can amplify losses and create operational/technical debt.")
+    if mask & BIT["urgency"]:
+        counters.append("Urgency can crowd out risk discovery—what critical unknowns are you skipping because of time pressure?")
+    if mask & BIT["spend"]:
+        counters.append("Upfront spend can create commitment bias—consider staged investment tied to measurable outcomes.")
+    if mask & BIT["certainty"]:
+        counters.append("High certainty may be masking untested assumptions—what evidence would change your mind?")
+
+    if context_mask & BIT["budget"]:
+        counters.append("With a constrained budget, downside scenarios matter more—what if adoption is 50% of forecast?")
+
+    if not counters:
+        counters.append("The decision may be underestimating uncertainty and external dependencies (people, vendors, systems, approvals).")
+
+    hard_additions = [
+        "Pre-mortem: assume this fails in 6 months—what is the most likely reason?",
+        "If your key assumption is wrong, what irreversible cost (reputation, money, talent) do you incur?",
+    ]
+    if disagree_level >= 3:
+        counters.append(hard_additions[0])
+    if disagree_level >= 5:
+        counters.append(hard_additions[1])
+
+    # Make levels visibly different
+    max_n = {1: 2, 2: 3, 3: 4, 4: 5, 5: 6}[disagree_level]
+    return tuple(counters[:max_n])
+
+def second_order_impacts(intent, disagree_level):
+    return impacts_from_mask(analyze_text(intent["decision"]).mask, disagree_level)
+
+def impacts_from_mask(mask, disagree_level):
+    return list(_impacts(mask & IMPACT_BITS, disagree_level))
+
+@functools.cache
+def _impacts(mask, disagree_level):
+    impacts = []
+
+    if mask & BIT["delivery"]:
+        impacts.append("Operational load may spike faster than team capacity, increasing failure rate and burnout.")
+    if mask & BIT["integration"]:
+        impacts.append("Integration delays can cascade into missed timelines and budget overruns.")
+    impacts.append("If early outcomes disappoint, reversing course may be reputationally costly.")
+    impacts.append("Short-term optimization may reduce long-term optionality (harder pivots, locked-in commitments).")
+    if disagree_level >= 4:
+        impacts.append("Stakeholder trust can degrade if timelines are missed—slowing approvals for future initiatives.")
+
+    return tuple(impacts)
+
+RECOMMENDATIONS = (
+    "Run a time-bound pilot to validate key assumptions before full commitment.",
+    "Define explicit go/no-go criteria (metrics, thresholds, owners, dates).",
+    "Stage funding/spend in tranches tied to outcomes rather than upfront commitments.",
+    "Add a decision checkpoint before any irreversible investment (contracts, major hiring, public commitments).",
+)
+
+def derisk_recommendations(disagree_level):
+    return list(RECOMMENDATIONS[: (3 if disagree_level <= 3 else 4)])
+
+@functools.cache
+def _template(mask, context_mask, disagree_level):
+    return (
+        _counterarguments(mask & COUNTER_BITS, context_mask, disagree_level),
+        _impacts(mask & IMPACT_BITS, disagree_level),
+        RECOMMENDATIONS[: (3 if disagree_level <= 3 else 4)],
+    )
+
+def template_from_mask(mask, context_mask, disagree_level):
+    """(counterarguments, impacts, recommendations) for one decision: one dict lookup once warm."""
+    counters, impacts, recs = _template(
+        mask & (COUNTER_BITS | IMPACT_BITS),
+        context_mask & COUNTER_CONTEXT_BITS,
+        disagree_level,
+    )
+    return list(counters), list(impacts), list(recs)
@@ -0,0 +1,172 @@
+"""
+Batch analysis over CSV / JSONL files of (decision, context, level[, mode]) rows.
+
+Rows stream through a bounded thread pool and results are written as they
+complete (in input order), so memory stays flat whatever the file size.
+
+    python -m disagree.batch decisions.csv -o results.jsonl --workers 8
+"""
+import io
+import csv
+import sys
+import json
+import argparse
+import collections
+import concurrent.futures
+
+from .engine import MODES, analyze
+
+FORMATS = ("csv", "jsonl")
+CSV_FIELDS = ["row", "decision", "context", "level", "confidence", "biases",
+              "counterarguments", "impacts", "recommendations", "llm_error", "error"]
+
+def guess_format(name, default="jsonl"):
+    name = (name or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    return default
+
+def _text_field(record, name):
+    value = record.get(name)
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        raise ValueError(f"'{name}' must be a string")
+    return value
+
+def _level_field(record, default=3):
+    value = record.get("level")
+    if value is None or value == "":
+        return default
+    if isinstance(value, str) and value.strip().isdigit():  # CSV cells, or a quoted number in JSONL
+        value = int(value)
+    if type(value) is not int or not 1 <= value <= 5:
+        raise ValueError(f"'level' must be an integer 1-5, got {value!r}")
+    return value
+
+def _mode_field(record, default=None):
+    value = record.get("mode") or default
+    if value is not None and value not in MODES:
+        raise ValueError(f"'mode' must be one of {list(MODES)}, got {value!r}")
+    return value
+
+def parse_row(record, level=3, mode=None):
+    """
+    One input record -> {"decision", "context", "level", "mode"}, with level and
+    mode falling back to the given defaults. Raises ValueError for a bad record.
+    Shared by the batch runner, the CLI's JSONL mode and the HTTP service.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("expected a JSON object per line")
+    return {
+        "decision": _text_field(record, "decision"),
+        "context": _text_field(record, "context"),
+        "level": _level_field(record, level),
+        "mode": _mode_field(record, mode),
+    }
+
+def read_rows(fp, fmt="jsonl"):
+    """
+    Yields parse_row() dicts from a text stream (mode is None unless the row sets it).
+    Blank JSONL lines are skipped; a row that can't be read is yielded as
+    {"error": "..."} so one bad line doesn't stop the batch.
+    """
+    if fmt == "csv":
+        records = csv.DictReader(fp)
+    else:
+        records = (line for line in fp if line.strip())
+
+    for record in records:
+        try:
+            if fmt != "csv":
+                record = json.loads(record)
+            yield parse_row(record)
+        except ValueError as e:
+            yield {"error": f"unreadable row: {e}"}
+
+def _analyze_row(index, row, mode):
+    if "error" in row:
+        return {"row": index, "error": row["error"]}
+    try:
+        result = analyze(row["decision"], row["context"], level=row["level"], mode=row.get("mode") or mode)
+    except Exception as e:  # one bad row must not stop the batch
+        return {"row": index, "error": str(e)}
+    return {"row": index, **result.to_dict()}
+
+def run_batch(rows, mode="template", workers=4, max_pending=None):
+    """
+    Runs analyze() over rows on a thread pool and yields one record per row, in
+    input order. At most max_pending rows (default 4 x workers) are in flight, so
+    a huge input is never read ahead into memory.
+    """
+    max_pending = max_pending or workers * 4
+    pending = collections.deque()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        for index, row in enumerate(rows):
+            pending.append(pool.submit(_analyze_row, index, row, mode))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+class ResultWriter:
+    """Writes batch records to a text stream as JSONL or CSV, one at a time."""
+
+    def __init__(self, fp, fmt="jsonl"):
+        self.fp = fp
+        self.fmt = fmt
+        self.count = 0
+        self._csv = None
+        if fmt == "csv":
+            self._csv = csv.DictWriter(fp, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            self._csv.writeheader()
+
+    def write(self, record):
+        if self._csv is not None:
+            self._csv.writerow(_flatten(record))
+        else:
+            self.fp.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.count += 1
+
+def _flatten(record):
+    flat = dict(record)
+    intent = record.get("intent") or {}
+    flat["decision"] = intent.get("decision", "")
+    flat["context"] = intent.get("context", "")
+    for key in ("biases", "counterarguments", "impacts", "recommendations"):
+        if key in flat:
+            flat[key] = "\n".join(str(x) for x in flat[key])
+    return flat
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m disagree.batch", description="Analyze a CSV or JSONL file of decisions.")
+    parser.add_argument("input", help="CSV or JSONL file with decision, context, level, mode columns ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="output file ('-' for stdout, the default)")
+    parser.add_argument("--input-format", choices=FORMATS, help="default: from the file extension, else jsonl")
+    parser.add_argument("--output-format", choices=FORMATS, help="default: from the file extension, else jsonl")
+    parser.add_argument("--mode", choices=MODES, default="template", help="for rows that don't set their own")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    in_fmt = args.input_format or guess_format(args.input)
+    out_fmt = args.output_format or guess_format(args.output)
+
+    fin = sys.stdin if args.input == "-" else io.open(args.input, encoding="utf-8", newline="")
+    fout = sys.stdout if args.output == "-" else io.open(args.output, "w", encoding="utf-8", newline="")
+    try:
+        writer = ResultWriter(fout, out_fmt)
+        for record in run_batch(read_rows(fin, in_fmt), mode=args.mode, workers=args.workers):
+            writer.write(record)
+        fout.flush()
+    finally:
+        if fin is not sys.stdin:
+            fin.close()
+        if fout is not sys.stdout:
+            fout.close()
+    print(f"{writer.count} rows", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+"""
+Response caches for the LLM path.
+"""
+import os
+import time
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+def content_key(*parts):
+    """Stable sha256 hex digest of JSON-serializable parts."""
+    blob = json.dumps(parts, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+class LRUCache:
+    """
+    Thread-safe in-memory LRU with a per-entry TTL.
+    - maxsize: entries kept before the least recently used is evicted
+    - ttl: seconds an entry stays valid (None = forever)
+    """
+
+    def __init__(self, maxsize=512, ttl=None, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                expires, value = item
+                if expires is None or expires > self.clock():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        expires = None if self.ttl is None else self.clock() + self.ttl
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+class SQLiteCache:
+    """
+    Disk tier that survives restarts: key -> JSON value in SQLite.
+    WAL mode lets readers run concurrently with the single writer; each thread
+    gets its own connection. Size is bounded by max_bytes of stored values,
+    evicting least recently accessed rows first. The size total is kept as a
+    running count and recomputed (with expired rows dropped) every
+    RESYNC_EVERY writes, which also picks up other processes sharing the file.
+    """
+
+    RESYNC_EVERY = 256
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS responses (
+        key TEXT PRIMARY KEY,  -- prompt hash; the primary key is its index
+        value TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        created REAL NOT NULL,
+        accessed REAL NOT NULL,
+        hits INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+    """
+
+    def __init__(self, path, max_bytes=64 * 1024 * 1024, ttl=None, clock=time.time):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._total = None  # bytes stored, as of the last write
+        self._writes = 0
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            import sqlite3
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _fresh_after(self):
+        return float("-inf") if self.ttl is None else self.clock() - self.ttl
+
+    def get(self, key, default=None):
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value FROM responses WHERE key = ? AND created > ?",
+            (key, self._fresh_after()),
+        ).fetchone()
+        if row is None:
+            return default
+        conn.execute(
+            "UPDATE responses SET accessed = ?, hits = hits + 1 WHERE key = ?",
+            (self.clock(), key),
+        )
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        blob = json.dumps(value, ensure_ascii=False)
+        now = self.clock()
+        conn = self._conn()
+        with self._write_lock:
+            old = conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created, accessed, hits) VALUES (?, ?, ?, ?, ?, 0)",
+                (key, blob, len(blob), now, now),
+            )
+            if self._total is None or self._writes % self.RESYNC_EVERY == 0:
+                self._resync(conn)
+            else:
+                self._total += len(blob) - (old[0] if old else 0)
+            self._writes += 1
+            if self._total > self.max_bytes:
+                self._evict(conn)
+
+    def _resync(self, conn):
+        conn.execute("DELETE FROM responses WHERE created <= ?", (self._fresh_after(),))
+        self._total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _evict(self, conn):
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed"):
+            doomed.append((key,))
+            self._total -= size
+            if self._total <= self.max_bytes:
+                break
+        conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def hottest(self, limit):
+        """Most used (then most recent) live entries, hottest first."""
+        rows = self._conn().execute(
+            "SELECT key, value FROM responses WHERE created > ? ORDER BY hits DESC, accessed DESC LIMIT ?",
+            (self._fresh_after(), limit),
+        )
+        return [(key, json.loads(value)) for key, value in rows]
+
+class TieredCache:
+    """
+    Memory LRU in front of a disk cache. Disk hits are promoted into memory;
+    disk errors are treated as misses so a bad cache file never breaks a call.
+    """
+
+    def __init__(self, memory, disk):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key, default=None):
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        try:
+            value = self.disk.get(key)
+        except Exception:
+            value = None
+        if value is None:
+            return default
+        self.memory.set(key, value)
+        return value
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        try:
+            self.disk.set(key, value)
+        except Exception:
+            pass
+
+    def warm(self, limit):
+        """Loads the hottest disk entries into memory (hottest ends up most recent)."""
+        try:
+            entries = self.disk.hottest(limit)
+        except Exception:
+            return 0
+        for key, value in reversed(entries):
+            self.memory.set(key, value)
+        return len(entries)
+
+    def clear(self):
+        self.memory.clear()
+
+    def __len__(self):
+        return len(self.memory)
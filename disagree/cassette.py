@@ -0,0 +1,406 @@
+"""
+Record/replay of LLM calls ("cassettes"), for deterministic offline runs.
+
+    DISAGREE_CASSETTE_MODE=record DISAGREE_CASSETTE=calls.jsonl.gz python benchmarks/bench_e2e.py ...
+    DISAGREE_CASSETTE_MODE=replay DISAGREE_CASSETTE=calls.jsonl.gz DISAGREE_CASSETTE_TIMING=0.1 python ...
+
+In record mode every chat.completions.create call goes to the real client and
+is appended to a gzipped JSONL file: request hash, elapsed time, and either the
+answer or, for streams, each content delta with its offset from the request.
+In replay mode no network (and no openai package or key) is needed; calls are
+answered from the file in recorded order per request, sleeping for the recorded
+time scaled by DISAGREE_CASSETTE_TIMING ("original" = 1, "compressed" = 0.1,
+"none" = 0, or any factor). Recorded API errors are replayed as errors, and a
+stream's final usage chunk is replayed after its content. The LLM response
+cache is off in both modes so every call reaches the cassette.
+"""
+import os
+import gzip
+import json
+import time
+import asyncio
+import threading
+import collections
+
+from .cache import content_key
+
+MODES = ("record", "replay")
+
+MODE = os.getenv("DISAGREE_CASSETTE_MODE", "").strip().lower()
+PATH = os.getenv("DISAGREE_CASSETTE", "llm_cassette.jsonl.gz").strip()
+TIMING = os.getenv("DISAGREE_CASSETTE_TIMING", "original").strip().lower()
+
+if MODE and MODE not in MODES:
+    raise ValueError(f"DISAGREE_CASSETTE_MODE must be one of {MODES}, got {MODE!r}")
+
+RECORDING = MODE == "record"
+REPLAYING = MODE == "replay"
+
+class CassetteMiss(LookupError):
+    """Replay mode got a request that was never recorded."""
+
+class ReplayedError(RuntimeError):
+    """An API error that was recorded, raised again on replay."""
+
+TIMING_PRESETS = {"original": 1.0, "compressed": 0.1, "none": 0.0}
+
+def timing_factor(spec):
+    """Replay speed: a preset name or a factor applied to recorded delays."""
+    return TIMING_PRESETS[spec] if spec in TIMING_PRESETS else float(spec)
+
+def request_key(kwargs):
+    return content_key({k: v for k, v in kwargs.items() if k not in ("timeout", "extra_headers")})
+
+class Cassette:
+    """
+    A cassette file: appends records (record mode) or serves them by request key
+    (replay mode). Each record is written as its own gzip member, so the file is
+    complete after every call and a process that dies mid-run loses nothing but
+    the record being written.
+    """
+
+    def __init__(self, path, timing="original"):
+        self.path = path
+        self.factor = timing_factor(timing)
+        self._lock = threading.Lock()
+        self._records = collections.defaultdict(list)
+        self._next = collections.Counter()
+
+    def load(self):
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as fp:
+                for line in fp:
+                    if line.endswith("\n") and line.strip():
+                        record = json.loads(line)
+                        self._records[record["key"]].append(record)
+        except (EOFError, gzip.BadGzipFile):
+            pass  # a record cut off mid-write; the ones before it are whole
+        return self
+
+    def append(self, record):
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        member = gzip.compress(line.encode("utf-8"))
+        with self._lock, open(self.path, "ab") as fp:
+            fp.write(member)
+
+    def next(self, key):
+        """The next recording for key; cycles when a request was replayed more often than recorded."""
+        with self._lock:
+            records = self._records.get(key)
+            if not records:
+                raise CassetteMiss(f"no recorded LLM call for this request in {self.path}")
+            record = records[self._next[key] % len(records)]
+            self._next[key] += 1
+        return record
+
+_cassette = None
+_cassette_lock = threading.Lock()
+
+def get_cassette():
+    global _cassette
+    with _cassette_lock:
+        if _cassette is None:
+            _cassette = Cassette(PATH, TIMING)
+            if REPLAYING:
+                _cassette.load()
+    return _cassette
+
+# -----------------------------
+# Replayed responses (attribute access like the openai objects we read)
+# -----------------------------
+class _Obj:
+    def __init__(self, data):
+        for name, value in data.items():
+            setattr(self, name, _wrap(value))
+
+def _wrap(value):
+    if isinstance(value, dict):
+        return _Obj(value)
+    if isinstance(value, list):
+        return [_wrap(v) for v in value]
+    return value
+
+def _response(record):
+    return _Obj({
+        "id": record.get("id"),
+        "model": record.get("model"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": record["content"]}, "finish_reason": record.get("finish")}],
+        "usage": record.get("usage"),
+    })
+
+def _chunk(record, content, finish=None):
+    return _Obj({
+        "id": record.get("id"),
+        "model": record.get("model"),
+        "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": finish}],
+        "usage": None,
+    })
+
+def _usage_chunk(record):
+    # stream_options={"include_usage": True}: no choices, just the token counts.
+    return _Obj({"id": record.get("id"), "model": record.get("model"), "choices": [], "usage": record["usage"]})
+
+def _raise_if_error(record):
+    if "error" in record:
+        raise ReplayedError(record["error"])
+
+def _timed_out():
+    return TimeoutError("Request timed out.")
+
+class _ReplayStream:
+    def __init__(self, record, factor, timeout=None):
+        self.record = record
+        self.factor = factor
+        self.timeout = timeout
+
+    def _delay(self, start, last, offset):
+        # (seconds until the chunk at `offset` ms is due, timed out?). With a read
+        # timeout, a longer scaled gap since the previous chunk ends the stream.
+        if self.timeout is not None and (offset - last) / 1000 * self.factor > self.timeout:
+            return start + last / 1000 * self.factor + self.timeout - time.monotonic(), True
+        return start + offset / 1000 * self.factor - time.monotonic(), False
+
+    def __iter__(self):
+        start, last = time.monotonic(), 0
+        for offset, content, *finish in self.record["chunks"]:
+            delay, timed_out = self._delay(start, last, offset)
+            if delay > 0:
+                time.sleep(delay)
+            if timed_out:
+                raise _timed_out()
+            last = offset
+            yield _chunk(self.record, content, *finish)
+        if self.record.get("usage") is not None:
+            yield _usage_chunk(self.record)
+        _raise_if_error(self.record)
+
+    def close(self):
+        pass
+
+class _AsyncReplayStream(_ReplayStream):
+    async def _aiter(self):
+        start, last = time.monotonic(), 0
+        for offset, content, *finish in self.record["chunks"]:
+            delay, timed_out = self._delay(start, last, offset)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if timed_out:
+                raise _timed_out()
+            last = offset
+            yield _chunk(self.record, content, *finish)
+        if self.record.get("usage") is not None:
+            yield _usage_chunk(self.record)
+        _raise_if_error(self.record)
+
+    def __aiter__(self):
+        return self._aiter()
+
+    async def close(self):
+        pass
+
+class _Namespace:
+    def __init__(self, **attrs):
+        self.__dict__.update(attrs)
+
+class ReplayClient:
+    """
+    Stands in for OpenAI() / AsyncOpenAI(): chat.completions.create answers from
+    the cassette. A timeout (with_options) applies to the scaled wait for the
+    answer or between stream chunks, and raises TimeoutError like a slow API.
+    """
+
+    def __init__(self, cassette, async_=False, timeout=None):
+        self.cassette = cassette
+        self.async_ = async_
+        self.timeout = timeout
+        self.chat = _Namespace(completions=_Namespace(create=self._create_async if async_ else self._create))
+
+    def with_options(self, timeout=None, **options):
+        return ReplayClient(self.cassette, self.async_, self.timeout if timeout is None else timeout)
+
+    def _wait(self, record):
+        # Seconds to sleep for a non-streamed answer; None if it would time out first.
+        delay = record["elapsed"] / 1000 * self.cassette.factor
+        return None if self.timeout is not None and delay > self.timeout else delay
+
+    def _lookup(self, kwargs):
+        record = self.cassette.next(request_key(kwargs))
+        if bool(kwargs.get("stream")) != ("chunks" in record):
+            raise CassetteMiss("recorded call was made with a different 'stream' setting")
+        return record
+
+    def _create(self, **kwargs):
+        record = self._lookup(kwargs)
+        if kwargs.get("stream"):
+            return _ReplayStream(record, self.cassette.factor, self.timeout)
+        delay = self._wait(record)
+        time.sleep(self.timeout if delay is None else delay)
+        if delay is None:
+            raise _timed_out()
+        _raise_if_error(record)
+        return _response(record)
+
+    async def _create_async(self, **kwargs):
+        record = self._lookup(kwargs)
+        if kwargs.get("stream"):
+            return _AsyncReplayStream(record, self.cassette.factor, self.timeout)
+        delay = self._wait(record)
+        await asyncio.sleep(self.timeout if delay is None else delay)
+        if delay is None:
+            raise _timed_out()
+        _raise_if_error(record)
+        return _response(record)
+
+# -----------------------------
+# Recording
+# -----------------------------
+def _ms(start):
+    return round((time.monotonic() - start) * 1000, 1)
+
+def _dump_usage(usage):
+    return usage.model_dump() if hasattr(usage, "model_dump") else usage
+
+def _answer_record(key, start, resp):
+    choice = resp.choices[0]
+    return {
+        "key": key,
+        "elapsed": _ms(start),
+        "id": resp.id,
+        "model": resp.model,
+        "content": choice.message.content,
+        "finish": choice.finish_reason,
+        "usage": _dump_usage(getattr(resp, "usage", None)),
+    }
+
+def _error_record(key, start, error, chunks=None):
+    record = {"key": key, "elapsed": _ms(start), "error": str(error)}
+    if chunks is not None:
+        record["chunks"] = chunks
+    return record
+
+class _StreamRecorder:
+    """
+    Collects [offset_ms, content(, finish_reason)] per chunk, plus the final
+    usage chunk's counts; written once, when the stream ends.
+    """
+
+    def __init__(self, cassette, key, start):
+        self.cassette = cassette
+        self.key = key
+        self.start = start
+        self.chunks = []
+        self.meta = {}
+        self.done = False
+
+    def add(self, chunk):
+        usage = getattr(chunk, "usage", None)
+        if usage is not None:
+            self.meta["usage"] = _dump_usage(usage)
+        if not chunk.choices:
+            return
+        if "id" not in self.meta:
+            self.meta.update(id=chunk.id, model=chunk.model)
+        choice = chunk.choices[0]
+        entry = [_ms(self.start), choice.delta.content]
+        if choice.finish_reason:
+            entry.append(choice.finish_reason)
+        self.chunks.append(entry)
+
+    def discard(self):
+        # Cancelled or closed early by our side (deadline, client gone): not what
+        # the API did. A no-op once the stream was read to the end.
+        self.done = True
+
+    def finish(self, error=None):
+        if self.done:
+            return
+        self.done = True
+        if error is not None:
+            self.cassette.append(_error_record(self.key, self.start, error, self.chunks))
+        else:
+            self.cassette.append({"key": self.key, "elapsed": _ms(self.start), **self.meta, "chunks": self.chunks})
+
+class _RecordingStream:
+    def __init__(self, stream, recorder):
+        self.stream = stream
+        self.recorder = recorder
+
+    def __iter__(self):
+        try:
+            for chunk in self.stream:
+                self.recorder.add(chunk)
+                yield chunk
+        except Exception as e:
+            self.recorder.finish(e)
+            raise
+        self.recorder.finish()
+
+    def close(self):
+        self.recorder.discard()
+        self.stream.close()
+
+class _AsyncRecordingStream(_RecordingStream):
+    async def _aiter(self):
+        try:
+            async for chunk in self.stream:
+                self.recorder.add(chunk)
+                yield chunk
+        except asyncio.CancelledError:
+            self.recorder.discard()
+            raise
+        except Exception as e:
+            self.recorder.finish(e)
+            raise
+        self.recorder.finish()
+
+    def __aiter__(self):
+        return self._aiter()
+
+    async def close(self):
+        self.recorder.discard()
+        await self.stream.close()
+
+class RecordingClient:
+    """Wraps OpenAI() / AsyncOpenAI(): calls pass through and are appended to the cassette."""
+
+    def __init__(self, client, cassette, async_=False):
+        self.client = client
+        self.cassette = cassette
+        self.async_ = async_
+        self.chat = _Namespace(completions=_Namespace(create=self._create_async if async_ else self._create))
+
+    def with_options(self, **options):
+        return RecordingClient(self.client.with_options(**options), self.cassette, self.async_)
+
+    def _create(self, **kwargs):
+        key, start = request_key(kwargs), time.monotonic()
+        try:
+            resp = self.client.chat.completions.create(**kwargs)
+        except Exception as e:
+            self.cassette.append(_error_record(key, start, e, [] if kwargs.get("stream") else None))
+            raise
+        if kwargs.get("stream"):
+            return _RecordingStream(resp, _StreamRecorder(self.cassette, key, start))
+        self.cassette.append(_answer_record(key, start, resp))
+        return resp
+
+    async def _create_async(self, **kwargs):
+        key, start = request_key(kwargs), time.monotonic()
+        try:
+            resp = await self.client.chat.completions.create(**kwargs)
+        except Exception as e:
+            self.cassette.append(_error_record(key, start, e, [] if kwargs.get("stream") else None))
+            raise
+        if kwargs.get("stream"):
+            return _AsyncRecordingStream(resp, _StreamRecorder(self.cassette, key, start))
+        self.cassette.append(_answer_record(key, start, resp))
+        return resp
+
+def wrap(client, async_=False):
+    """The client to use: recorded in record mode, unchanged otherwise."""
+    if RECORDING:
+        return RecordingClient(client, get_cassette(), async_)
+    return client
+
+def replay_client(async_=False):
+    return ReplayClient(get_cassette(), async_)
@@ -0,0 +1,84 @@
+"""
+Headless command line entry point.
+
+    python -m disagree "We should launch Product X in 3 months" -c "Budget $500k" -l 4
+    python -m disagree --json "Ship it ASAP"
+    cat decisions.jsonl | python -m disagree - > results.jsonl
+
+Only the core engine is imported at start-up; the LLM modules (and openai) load
+only when --mode openai is used, so template mode starts in a few tens of ms.
+"""
+import sys
+import json
+import argparse
+
+from .engine import MODES, analyze
+
+MODE_LABELS = {1: "Gentle nudge", 2: "Constructive challenge", 3: "Devil's advocate", 4: "Hard pushback", 5: "Brutally honest"}
+
+def format_text(result):
+    lines = [
+        f"Disagreement mode: {MODE_LABELS[result.level]} ({result.level}/5)",
+        f"Confidence (heuristic): {result.confidence}/100",
+        "",
+        "Bias signals:",
+        *(f"  - {b}" for b in result.biases),
+        "",
+        "Key counterarguments:",
+        *(f"  - {c}" for c in result.counterarguments),
+        "",
+        "Second-order impacts:",
+        *(f"  - {i}" for i in result.impacts),
+        "",
+        "De-risking recommendations:",
+        *(f"  - {r}" for r in result.recommendations),
+    ]
+    if result.llm_error:
+        lines += ["", f"(OpenAI failed; template mode used: {result.llm_error[:300]})"]
+    return "\n".join(lines)
+
+def run_jsonl(fin, fout, level, mode):
+    """
+    One JSON object per input line -> one result per output line, flushed as it
+    goes. Rows are read exactly as python -m disagree.batch reads them.
+    """
+    from .batch import parse_row
+
+    for line in fin:
+        if not line.strip():
+            continue
+        try:
+            row = parse_row(json.loads(line), level, mode)
+        except ValueError as e:
+            record = {"error": f"unreadable row: {e}"}
+        else:
+            try:
+                record = analyze(row["decision"], row["context"], level=row["level"], mode=row["mode"]).to_dict()
+            except Exception as e:  # one bad row must not stop the stream
+                record = {"error": str(e)}
+        fout.write(json.dumps(record, ensure_ascii=False) + "\n")
+        fout.flush()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="disagree", description="Challenge a decision from the command line.")
+    parser.add_argument("decision", help="decision text, or '-' to read JSONL rows from stdin and write JSONL results")
+    parser.add_argument("-c", "--context", default="", help="optional context (constraints, assumptions, goals)")
+    parser.add_argument("-l", "--level", type=int, default=3, choices=range(1, 6), metavar="1-5", help="disagreement level (default 3)")
+    parser.add_argument("--mode", choices=MODES, default="template")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    parser.add_argument("--fail-under", type=int, metavar="SCORE", help="exit 1 if the confidence score is below SCORE (for hooks)")
+    args = parser.parse_args(argv)
+
+    if args.decision == "-":
+        run_jsonl(sys.stdin, sys.stdout, args.level, args.mode)
+        return 0
+
+    result = analyze(args.decision, args.context, level=args.level, mode=args.mode)
+    if args.json:
+        print(json.dumps(result.to_dict(), ensure_ascii=False, indent=2))
+    else:
+        print(format_text(result))
+
+    if args.fail_under is not None and result.confidence < args.fail_under:
+        return 1
+    return 0
@@ -0,0 +1,281 @@
+"""
+analyze(): the full disagreement pipeline for one decision, without any UI.
+"""
+import copy
+import time
+
+from . import metrics
+from .text import analyze_text
+from .timing import span
+from .agents import intent_decoder, bias_detector, confidence_score, template_from_mask
+
+MODES = ("template", "openai")
+
+class Result:
+    """
+    Output of analyze() for one decision at one level.
+    A plain slotted class rather than a dataclass: importing dataclasses pulls in
+    inspect, which is most of this package's cold-start time.
+    """
+
+    FIELDS = ("intent", "biases", "confidence", "counterarguments", "impacts",
+              "recommendations", "level", "mode", "llm_error")
+    __slots__ = FIELDS
+
+    def __init__(self, intent, biases, confidence, counterarguments, impacts,
+                 recommendations, level, mode, llm_error=None):
+        self.intent = intent
+        self.biases = biases
+        self.confidence = confidence
+        self.counterarguments = counterarguments
+        self.impacts = impacts
+        self.recommendations = recommendations
+        self.level = level
+        self.mode = mode
+        self.llm_error = llm_error
+
+    def to_dict(self):
+        return {field: copy.deepcopy(getattr(self, field)) for field in self.FIELDS}
+
+    def replace(self, **changes):
+        return Result(**{**{field: getattr(self, field) for field in self.FIELDS}, **changes})
+
+    def __eq__(self, other):
+        return isinstance(other, Result) and all(getattr(self, f) == getattr(other, f) for f in self.FIELDS)
+
+    def __repr__(self):
+        return "Result(" + ", ".join(f"{f}={getattr(self, f)!r}" for f in self.FIELDS) + ")"
+
+    def __getstate__(self):
+        # st.cache_data and process pools pickle results; __slots__ needs explicit state.
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def __setstate__(self, state):
+        for field in self.FIELDS:
+            setattr(self, field, state[field])
+
+def template_outputs(intent, level):
+    """(counterarguments, impacts, recommendations) from the memoized templates."""
+    return template_from_mask(
+        analyze_text(intent["decision"]).mask,
+        analyze_text(intent["context"]).mask,
+        level,
+    )
+
+def analyze(decision, context="", level=3, mode="template", deadline=None, on_partial=None):
+    """
+    Runs intent -> biases -> confidence -> generators for one decision.
+    mode="openai" races a single LLM call against `deadline` seconds
+    (DISAGREE_LLM_DEADLINE by default) and falls back to templates if it is late
+    or fails (the reason is kept on Result.llm_error). on_partial, if given,
+    receives the template Result while the LLM call is still in flight.
+    """
+    start = time.perf_counter()
+    result = _analyze(decision, context, level, mode, deadline, on_partial)
+    metrics.observe_submit(mode, start, result.llm_error)
+    return result
+
+def _analyze(decision, context, level, mode, deadline=None, on_partial=None):
+    if level not in (1, 2, 3, 4, 5):
+        raise ValueError(f"level must be 1-5, got {level!r}")
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+
+    with span("intent"):
+        decision_doc = analyze_text(decision)
+        context_doc = analyze_text(context)
+        intent = intent_decoder(decision_doc, context_doc)
+    with span("biases"):
+        biases = bias_detector(intent)
+    with span("confidence"):
+        conf = confidence_score(decision_doc, context_doc)
+
+    def result(outputs, llm_error=None):
+        counterargs, impacts, recs = outputs
+        return Result(
+            intent=intent,
+            biases=biases,
+            confidence=conf,
+            counterarguments=counterargs,
+            impacts=impacts,
+            recommendations=recs,
+            level=level,
+            mode=mode,
+            llm_error=llm_error,
+        )
+
+    if mode == "openai":
+        # Imported here so template-only callers never load the LLM modules.
+        from .gateway import race_blocking
+
+        on_template = None
+        if on_partial is not None:
+            on_template = lambda *outputs: on_partial(result(outputs))
+        outputs, llm_error = race_blocking(intent, level, deadline=deadline, on_template=on_template)
+        return result(outputs, llm_error)
+
+    with span("templates"):
+        outputs = template_outputs(intent, level)
+    return result(outputs)
+
+async def analyze_async(decision, context="", level=3, mode="template", deadline=None, executor=None):
+    """
+    analyze() for asyncio callers. The heuristics run on `executor` (the loop's
+    default executor if None) so the event loop stays free; in openai mode the
+    LLM call is awaited on the running loop via gateway.race, bounded by deadline.
+    """
+    import asyncio
+    import functools
+
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+    start = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    template = await loop.run_in_executor(executor, functools.partial(_analyze, decision, context, level, "template"))
+    if mode == "template":
+        metrics.observe_submit(mode, start)
+        return template
+
+    from .gateway import race
+
+    (counterargs, impacts, recs), llm_error = await race(template.intent, level, deadline)
+    metrics.observe_submit(mode, start, llm_error)
+    return template.replace(
+        mode=mode,
+        counterarguments=counterargs,
+        impacts=impacts,
+        recommendations=recs,
+        llm_error=llm_error,
+    )
+
+def analyze_levels(decision, context="", mode="template", deadline=None):
+    """
+    Results for all five disagreement levels at once: {level: Result}.
+    Parsing and scoring run once; in openai mode one batched LLM request answers
+    for every level (bounded by LEVELS_DEADLINE), and any level it fails to
+    cover falls back to templates.
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+
+    start = time.perf_counter()
+    with span("intent"):
+        decision_doc = analyze_text(decision)
+        context_doc = analyze_text(context)
+        intent = intent_decoder(decision_doc, context_doc)
+    with span("biases"):
+        biases = bias_detector(intent)
+    with span("confidence"):
+        conf = confidence_score(decision_doc, context_doc)
+
+    llm_levels, llm_error = {}, None
+    if mode == "openai":
+        from .llm import HAS_OPENAI, openai_all_levels_async
+        from .gateway import LEVELS_DEADLINE, split_outputs, submit, wait
+
+        if HAS_OPENAI:
+            out, llm_error = wait(submit(openai_all_levels_async(intent)), LEVELS_DEADLINE if deadline is None else deadline)
+            for level, o in (out or {}).items():
+                try:
+                    llm_levels[level] = split_outputs(o)
+                except ValueError:
+                    pass  # falls back to the template for that level
+        else:
+            llm_error = "OPENAI_API_KEY is not set"
+
+    results = {}
+    for level in (1, 2, 3, 4, 5):
+        if level in llm_levels:
+            outputs, error = llm_levels[level], None
+        else:
+            outputs = template_from_mask(decision_doc.mask, context_doc.mask, level)
+            error = None if mode == "template" else (llm_error or f"OpenAI answer had no level {level}")
+        counterargs, impacts, recs = outputs
+        results[level] = Result(
+            intent=intent,
+            biases=biases,
+            confidence=conf,
+            counterarguments=counterargs,
+            impacts=impacts,
+            recommendations=recs,
+            level=level,
+            mode=mode,
+            llm_error=error,
+        )
+    metrics.observe_submit(mode, start, llm_error)
+    return results
+
+def analyze_stream(decision, context="", level=3, deadline=None):
+    """
+    Streaming openai mode. Yields (event, payload) pairs:
+    - ("template", Result): heuristics and template outputs, immediately
+    - (section, item): each LLM counterargument / impact / recommendation as soon
+      as it is complete ("counterarguments", "impacts", "recommendations")
+    - ("done", Result): the final result; template outputs with llm_error set if
+      the call failed or streamed no item within `deadline` seconds
+      (DISAGREE_LLM_DEADLINE by default)
+    """
+    start = time.perf_counter()
+    template = _analyze(decision, context, level, "template")
+    yield "template", template
+
+    from .llm import HAS_OPENAI, openai_one_call_stream
+    from .gateway import LLM_DEADLINE, deadline_message, split_outputs
+
+    deadline = LLM_DEADLINE if deadline is None else deadline
+    final = template.replace(mode="openai")
+    try:
+        if not HAS_OPENAI:
+            raise RuntimeError("OPENAI_API_KEY is not set")
+        out = yield from openai_one_call_stream(template.intent, level, first_item_timeout=deadline)
+        final.counterarguments, final.impacts, final.recommendations = split_outputs(out)
+    except TimeoutError:
+        final.llm_error = deadline_message(deadline)
+    except Exception as e:
+        final.llm_error = str(e)
+    metrics.observe_submit("openai", start, final.llm_error)
+    yield "done", final
+
+async def analyze_stream_async(decision, context="", level=3, executor=None, deadline=None):
+    """
+    analyze_stream() as an async generator, with the same events and deadline.
+    The heuristics run on `executor`; the LLM answer streams on the running loop.
+    """
+    import asyncio
+    import functools
+
+    start = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    template = await loop.run_in_executor(executor, functools.partial(_analyze, decision, context, level, "template"))
+    yield "template", template
+
+    from .llm import HAS_OPENAI, SECTIONS, openai_one_call_stream_async
+    from .gateway import LLM_DEADLINE, deadline_message
+
+    deadline = LLM_DEADLINE if deadline is None else deadline
+    final = template.replace(mode="openai")
+    items = {section: [] for section in SECTIONS}
+    try:
+        if not HAS_OPENAI:
+            raise RuntimeError("OPENAI_API_KEY is not set")
+        stream = openai_one_call_stream_async(template.intent, level)
+        try:
+            # The first item races the deadline; once the answer is flowing it may finish.
+            first = await asyncio.wait_for(stream.__anext__(), deadline)
+        except StopAsyncIteration:
+            first = None
+        except asyncio.TimeoutError:
+            raise TimeoutError(deadline_message(deadline)) from None
+        if first is not None:
+            items[first[0]].append(first[1])
+            yield first
+            async for section, item in stream:
+                items[section].append(item)
+                yield section, item
+        final.counterarguments = items["counterarguments"]
+        final.impacts = items["impacts"]
+        final.recommendations = items["recommendations"]
+    except Exception as e:
+        final.llm_error = str(e)
+    metrics.observe_submit("openai", start, final.llm_error)
+    yield "done", final
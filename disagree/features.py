@@ -0,0 +1,112 @@
+"""
+Batch feature extraction shared by all heuristic agents.
+
+extract() scans each document once and packs every keyword rule into a bitset
+row: bit i is decision group i, bit N_GROUPS + i is context group i (groups in
+KEYWORD_GROUPS order). The agents' *_from_mask functions are projections of
+that row, so biases, confidence and template outputs for a whole batch come
+from the matrix without touching the text again.
+"""
+from array import array
+
+from .text import KEYWORD_GROUPS, AnalyzedText
+from .agents import (
+    join_mask,
+    signals_from_mask,
+    biases_from_mask,
+    confidence_from_features,
+    counterarguments_from_mask,
+    impacts_from_mask,
+)
+
+N_GROUPS = len(KEYWORD_GROUPS)
+COLUMNS = [f"decision:{g}" for g in KEYWORD_GROUPS] + [f"context:{g}" for g in KEYWORD_GROUPS]
+_GROUP_MASK = (1 << N_GROUPS) - 1
+
+class FeatureMatrix:
+    """
+    Packed-bitset feature matrix for a batch of (decision, context) pairs.
+    - masks: one uint64 row per document, one bit per column in COLUMNS
+    - numbers, decision_len, context_len: the numeric inputs of confidence_score
+    - join_masks: groups matched only across the decision/context join (agents.join_mask)
+    """
+
+    columns = COLUMNS
+
+    def __init__(self, masks, numbers, decision_len, context_len, join_masks=None):
+        self.masks = masks
+        self.numbers = numbers
+        self.decision_len = decision_len
+        self.context_len = context_len
+        self.join_masks = array("Q", bytes(8 * len(masks))) if join_masks is None else join_masks
+
+    def __len__(self):
+        return len(self.masks)
+
+    def decision_mask(self, i):
+        return self.masks[i] & _GROUP_MASK
+
+    def context_mask(self, i):
+        return self.masks[i] >> N_GROUPS
+
+    def column(self, name):
+        """Boolean column by name, e.g. "decision:urgency"."""
+        bit = 1 << COLUMNS.index(name)
+        return [bool(m & bit) for m in self.masks]
+
+    def to_csr(self):
+        """The same matrix as a scipy.sparse.csr_matrix of 0/1 (requires scipy)."""
+        from scipy.sparse import csr_matrix
+
+        indptr, indices = [0], []
+        for m in self.masks:
+            while m:
+                low = m & -m
+                indices.append(low.bit_length() - 1)
+                m ^= low
+            indptr.append(len(indices))
+        data = [1] * len(indices)
+        return csr_matrix((data, indices, indptr), shape=(len(self), len(COLUMNS)), dtype="uint8")
+
+def extract(decisions, contexts=None):
+    """One text scan per document -> FeatureMatrix."""
+    if contexts is None:
+        contexts = [""] * len(decisions)
+    masks, numbers, decision_len, context_len, join_masks = array("Q"), array("l"), array("l"), array("l"), array("Q")
+    for decision, context in zip(decisions, contexts):
+        # AnalyzedText directly (not the memoized analyze_text) so large batches
+        # don't churn the per-request cache.
+        doc = AnalyzedText((decision or "").strip())
+        ctx = AnalyzedText((context or "").strip())
+        masks.append(doc.mask | (ctx.mask << N_GROUPS))
+        numbers.append(len(doc.numbers) + len(ctx.numbers))
+        decision_len.append(len(doc.raw))
+        context_len.append(len(ctx.raw))
+        join_masks.append(join_mask(doc, ctx))
+    return FeatureMatrix(masks, numbers, decision_len, context_len, join_masks)
+
+# -----------------------------
+# Agent projections
+# -----------------------------
+def signals(fm):
+    return [signals_from_mask(fm.decision_mask(i)) for i in range(len(fm))]
+
+def biases(fm):
+    return [biases_from_mask(fm.decision_mask(i)) for i in range(len(fm))]
+
+def confidence(fm):
+    return [
+        confidence_from_features(
+            fm.decision_mask(i) | fm.context_mask(i) | fm.join_masks[i],
+            fm.numbers[i],
+            fm.decision_len[i],
+            fm.context_len[i],
+        )
+        for i in range(len(fm))
+    ]
+
+def counterarguments(fm, disagree_level):
+    return [counterarguments_from_mask(fm.decision_mask(i), fm.context_mask(i), disagree_level) for i in range(len(fm))]
+
+def impacts(fm, disagree_level):
+    return [impacts_from_mask(fm.decision_mask(i), disagree_level) for i in range(len(fm))]
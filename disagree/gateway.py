@@ -0,0 +1,117 @@
+"""
+Async LLM gateway: race the LLM call against a deadline, with the template
+outputs always computed up front so there is something to show immediately.
+"""
+import os
+import asyncio
+import threading
+import concurrent.futures
+
+from .engine import template_outputs
+from .timing import bind, span
+
+# Seconds to wait for the LLM before settling for the template result.
+LLM_DEADLINE = float(os.getenv("DISAGREE_LLM_DEADLINE", "8"))
+# The all-levels request produces about five times the tokens.
+LEVELS_DEADLINE = float(os.getenv("DISAGREE_LLM_LEVELS_DEADLINE", "20"))
+
+def split_outputs(out):
+    """(counterargs, impacts, recs) from a model answer; ValueError if it isn't the expected object."""
+    if not isinstance(out, dict):
+        raise ValueError(f"expected a JSON object from the model, got {type(out).__name__}")
+    sections = tuple(out.get(key, []) for key in ("counterarguments", "impacts", "recommendations"))
+    if not all(isinstance(section, list) for section in sections):
+        raise ValueError("model answer sections must be lists")
+    return sections
+
+def deadline_message(deadline):
+    return f"OpenAI did not answer within {deadline:g}s"
+
+async def race(intent, level, deadline=None, on_template=None):
+    """
+    Starts the LLM call, computes the template outputs while it is in flight and
+    passes them to on_template(counterargs, impacts, recs), then waits at most
+    `deadline` seconds. A late call is cancelled.
+    Returns ((counterargs, impacts, recs), llm_error); llm_error is None when the
+    LLM result won.
+    """
+    from .llm import HAS_OPENAI, openai_one_call_async
+
+    deadline = LLM_DEADLINE if deadline is None else deadline
+    if not HAS_OPENAI:
+        return template_outputs(intent, level), "OPENAI_API_KEY is not set"
+
+    task = asyncio.ensure_future(openai_one_call_async(intent, level))
+    await asyncio.sleep(0)  # let the request go out before doing local work
+    with span("templates"):
+        template = template_outputs(intent, level)
+    if on_template is not None:
+        on_template(*template)
+
+    try:
+        with span("llm"):
+            out = await asyncio.wait_for(task, deadline)
+        return split_outputs(out), None
+    except asyncio.TimeoutError:
+        return template, deadline_message(deadline)
+    except Exception as e:
+        return template, str(e)
+
+# -----------------------------
+# Blocking entry point (Streamlit script thread, worker threads)
+# -----------------------------
+_loop = None
+_loop_lock = threading.Lock()
+
+def get_loop():
+    """One background event loop per process, so async clients and their pools persist."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="disagree-llm-loop", daemon=True).start()
+    return _loop
+
+def submit(coro):
+    """Schedules a coroutine on the background loop; returns a concurrent Future."""
+    return asyncio.run_coroutine_threadsafe(bind(coro), get_loop())
+
+def wait(future, deadline=None):
+    """
+    (value, error) for a submit()ted call. A call still running at the deadline
+    is cancelled (which closes its request) and reported as an error.
+    """
+    deadline = LLM_DEADLINE if deadline is None else deadline
+    try:
+        with span("llm"):
+            return future.result(timeout=deadline), None
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        return None, deadline_message(deadline)
+    except Exception as e:
+        return None, str(e)
+
+def race_blocking(intent, level, deadline=None, on_template=None):
+    """
+    Same contract as race(), for synchronous callers. on_template runs in the
+    calling thread (so it may touch Streamlit), while the LLM call runs on the
+    background loop.
+    """
+    from .llm import HAS_OPENAI, openai_one_call_async
+
+    if not HAS_OPENAI:
+        return template_outputs(intent, level), "OPENAI_API_KEY is not set"
+
+    future = submit(openai_one_call_async(intent, level))
+    with span("templates"):
+        template = template_outputs(intent, level)
+    if on_template is not None:
+        on_template(*template)
+
+    out, error = wait(future, deadline)
+    if error is not None:
+        return template, error
+    try:
+        return split_outputs(out), None
+    except ValueError as e:
+        return template, str(e)
@@ -0,0 +1,175 @@
+"""
+Incremental parser for the model's JSON answer.
+
+The model is asked for {"counterarguments": [...], "impacts": [...],
+"recommendations": [...]}, but it may wrap that object in prose and, when
+streaming, it arrives a few characters at a time. ItemStream accepts chunks,
+reports each top-level list item the moment it closes, and ignores text before
+the object starts and after it ends.
+"""
+import re
+import json
+
+_TOKEN_RE = re.compile(
+    r'\s*(?:'
+    r'([{}\[\]:,])'                                                 # punctuation
+    r'|("(?:[^"\\]|\\.)*")'                                         # complete string
+    r'|(-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null)(?=[\s,\]}])'  # literal + delimiter
+    r')'
+)
+# Prefixes that are not an error yet, just unfinished: open string or literal.
+_PARTIAL_RE = re.compile(r'\s*(?:"(?:[^"\\]|\\.)*\\?|-?[\d.eE+-]*|t(?:r(?:ue?)?)?|f(?:a(?:l(?:se?)?)?)?|n(?:u(?:ll?)?)?)\Z')
+_LITERALS = {"true": True, "false": False, "null": None}
+
+class ItemStream:
+    """
+    feed(chunk) -> list of (section, item) for top-level list items completed by
+    this chunk. close() -> the parsed top-level object (raises ValueError if no
+    complete object was seen).
+    sections limits which top-level keys are reported (None = every list).
+    """
+
+    def __init__(self, sections=None):
+        self.sections = None if sections is None else frozenset(sections)
+        self.result = None
+        self._source = ""   # text from the current candidate "{" on (needed to restart)
+        self._pos = 0       # parse position in _source
+        self._started = False
+        self._stack = []
+        self._emitted = []
+        self._committed = False  # an item was reported; no more restarts
+        self._failed = False
+
+    @property
+    def done(self):
+        return self.result is not None
+
+    def feed(self, chunk):
+        if self.done or self._failed or not chunk:
+            return []
+        self._source += chunk
+        self._emitted = []
+        self._advance()
+        if self._emitted:
+            self._committed = True
+        if self._committed:
+            # Consumed text is no longer needed once we can't restart.
+            self._source = self._source[self._pos:]
+            self._pos = 0
+        return self._emitted
+
+    def close(self):
+        if not self.done:
+            raise ValueError("malformed JSON in model output" if self._failed else "no complete JSON object in model output")
+        return self.result
+
+    # -----------------------------
+    # Internals
+    # -----------------------------
+    def _advance(self):
+        while not self.done and not self._failed:
+            if not self._started:
+                start = self._source.find("{", self._pos)
+                if start == -1:
+                    # Keep nothing but a possible "{" to come; leading prose is dropped.
+                    self._source, self._pos = "", 0
+                    return
+                self._source = self._source[start:]
+                self._pos = 0
+                self._started = True
+
+            m = _TOKEN_RE.match(self._source, self._pos)
+            if m is None:
+                if _PARTIAL_RE.match(self._source, self._pos):
+                    return  # wait for more text
+                self._restart()
+                continue
+            self._pos = m.end()
+            try:
+                self._token(m)
+            except ValueError:
+                self._restart()
+
+    def _restart(self):
+        # The candidate object was not JSON (e.g. a "{" inside prose); retry from the
+        # next "{". Once items have been reported the object is committed to.
+        if self._committed:
+            self._failed = True
+            return
+        self._pos = 1
+        self._started = False
+        self._stack = []
+        self._emitted = []
+
+    def _token(self, m):
+        punct, string, literal = m.groups()
+        if string is not None:
+            self._value(json.loads(string))
+        elif literal is not None:
+            self._value(_LITERALS[literal] if literal in _LITERALS else json.loads(literal))
+        elif punct in "{[":
+            self._expect_value()
+            frame = [{} if punct == "{" else [], "key" if punct == "{" else "value_or_end", None]
+            if punct == "[" and len(self._stack) == 1:
+                frame[2] = self._stack[0][2]  # remember which top-level key this list belongs to
+            self._stack.append(frame)
+        elif punct in "}]":
+            if not self._stack:
+                raise ValueError("unbalanced")
+            container, expect, _ = self._stack[-1]
+            is_obj = isinstance(container, dict)
+            if (punct == "}") != is_obj or expect not in ("key", "value_or_end", "comma_or_end"):
+                raise ValueError("unexpected close")
+            if expect == "key" and container:
+                raise ValueError("trailing comma")
+            self._stack.pop()
+            self._complete(container)
+        elif punct == ":":
+            if not self._stack or self._stack[-1][1] != "colon":
+                raise ValueError("unexpected colon")
+            self._stack[-1][1] = "value"
+        elif punct == ",":
+            if not self._stack or self._stack[-1][1] != "comma_or_end":
+                raise ValueError("unexpected comma")
+            self._stack[-1][1] = "key" if isinstance(self._stack[-1][0], dict) else "value"
+
+    def _expect_value(self):
+        if not self._stack:
+            return  # the top-level object itself
+        expect = self._stack[-1][1]
+        if expect not in ("value", "value_or_end"):
+            raise ValueError("value not expected here")
+
+    def _value(self, value):
+        if self._stack and self._stack[-1][1] == "key":
+            if not isinstance(value, str):
+                raise ValueError("object key must be a string")
+            self._stack[-1][2] = value
+            self._stack[-1][1] = "colon"
+            return
+        self._expect_value()
+        self._complete(value)
+
+    def _complete(self, value):
+        if not self._stack:
+            if not isinstance(value, dict):
+                raise ValueError("top level must be an object")
+            self.result = value
+            return
+        frame = self._stack[-1]
+        container = frame[0]
+        if isinstance(container, dict):
+            container[frame[2]] = value
+        else:
+            container.append(value)
+            section = frame[2]
+            if len(self._stack) == 2 and (self.sections is None or section in self.sections):
+                self._emitted.append((section, value))
+        frame[1] = "comma_or_end"
+
+def parse_stream(chunks, sections=None):
+    """Generator over (section, item) for an iterable of text chunks; returns the parsed object."""
+    parser = ItemStream(sections)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    return parser.close()
@@ -0,0 +1,415 @@
+"""
+Optional OpenAI (single-call) integration.
+"""
+import os
+import sys
+import copy
+import json
+import time
+import asyncio
+import threading
+import weakref
+
+from . import cassette, metrics
+from .cache import LRUCache, SQLiteCache, TieredCache, content_key
+from .jsonstream import ItemStream
+from .text import normalize_quotes
+from .timing import span
+
+# Streamlit Cloud: set Secrets -> OPENAI_API_KEY="..."
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "").strip()
+# Replaying a cassette needs neither the key nor the openai package.
+HAS_OPENAI = bool(OPENAI_API_KEY) or cassette.REPLAYING
+
+OPENAI_MODEL = "gpt-4o-mini"
+
+# Bump when the prompt text or output schema changes so cached answers are not reused.
+PROMPT_VERSION = "1"
+
+# Shared by every session in the process; identical submissions skip the API call.
+# With DISAGREE_LLM_CACHE_DB set (default: the user cache dir; "" disables) a SQLite
+# tier keeps answers across restarts and the hottest entries are loaded at startup.
+LLM_CACHE_TTL = float(os.getenv("DISAGREE_LLM_CACHE_TTL", "86400"))
+
+def _default_cache_db():
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "disagree", "llm_cache.sqlite3")
+
+LLM_CACHE_DB = os.getenv("DISAGREE_LLM_CACHE_DB", _default_cache_db()).strip()
+# Recording and replaying a cassette must see every call, so the cache is off.
+if cassette.MODE:
+    LLM_CACHE_DB = ""
+
+RESPONSE_CACHE = LRUCache(
+    maxsize=0 if cassette.MODE else int(os.getenv("DISAGREE_LLM_CACHE_SIZE", "512")),
+    ttl=LLM_CACHE_TTL,
+)
+if LLM_CACHE_DB:
+    RESPONSE_CACHE = TieredCache(
+        RESPONSE_CACHE,
+        SQLiteCache(
+            LLM_CACHE_DB,
+            max_bytes=int(os.getenv("DISAGREE_LLM_CACHE_DB_BYTES", str(64 * 1024 * 1024))),
+            ttl=LLM_CACHE_TTL,
+        ),
+    )
+    if os.path.exists(LLM_CACHE_DB):
+        RESPONSE_CACHE.warm(int(os.getenv("DISAGREE_LLM_CACHE_WARM", "128")))
+
+# HTTP client tuning (seconds / connection counts)
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "30"))
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "1"))
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "32"))
+OPENAI_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_KEEPALIVE_CONNECTIONS", "16"))
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60"))
+
+_client = None
+_async_clients = weakref.WeakKeyDictionary()  # event loop -> AsyncOpenAI
+_client_lock = threading.Lock()
+
+def _client_options(httpx, async_=False):
+    limits = httpx.Limits(
+        max_connections=OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=OPENAI_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY,
+    )
+    return dict(
+        api_key=OPENAI_API_KEY,
+        timeout=httpx.Timeout(OPENAI_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT),
+        max_retries=OPENAI_MAX_RETRIES,
+        http_client=(httpx.AsyncClient if async_ else httpx.Client)(limits=limits),
+    )
+
+def get_client():
+    """
+    Process-wide OpenAI client, created on first use and shared by every caller
+    (all Streamlit sessions, worker threads). The underlying httpx pool keeps
+    connections alive, so repeat calls skip the TLS handshake.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                if cassette.REPLAYING:
+                    _client = cassette.replay_client()
+                    return _client
+                # Lazy import so template mode works even if openai isn't installed.
+                import httpx
+                from openai import OpenAI
+
+                _client = cassette.wrap(OpenAI(**_client_options(httpx)))
+    return _client
+
+def get_async_client():
+    """
+    AsyncOpenAI client for the running event loop. httpx async pools are bound
+    to the loop that created them, so there is one client per loop.
+    """
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            if cassette.REPLAYING:
+                client = _async_clients[loop] = cassette.replay_client(async_=True)
+                return client
+            import httpx
+            from openai import AsyncOpenAI
+
+            client = _async_clients[loop] = cassette.wrap(AsyncOpenAI(**_client_options(httpx, async_=True)), async_=True)
+    return client
+
+def _normalize_for_key(text):
+    return " ".join(normalize_quotes(text).split())
+
+def response_cache_key(intent, disagree_level):
+    return content_key(
+        _normalize_for_key(intent["decision"]),
+        _normalize_for_key(intent["context"]),
+        disagree_level,
+        OPENAI_MODEL,
+        PROMPT_VERSION,
+    )
+
+# -----------------------------
+# OpenAI single-call (Counterarguments + Impacts + Recommendations in one shot)
+# -----------------------------
+LEVEL_MODES = {1:"gentle",2:"constructive",3:"devils_advocate",4:"hard_pushback",5:"brutally_honest"}
+SECTIONS = ("counterarguments", "impacts", "recommendations")
+
+_PREAMBLE = """
+You are a constructive devil's advocate AI. Your job is to CHALLENGE a human decision, not to decide for them.
+
+Decision:
+{decision}
+
+Context:
+{context}
+
+Parsed signals:
+{signals}
+"""
+
+_SCHEMA = """{
+  "counterarguments": ["..."],
+  "impacts": ["..."],
+  "recommendations": ["..."]
+}"""
+
+_RULES = """Rules:
+- Be specific to the decision and context.
+- Counterarguments should increase in sharpness with intensity.
+- Impacts should focus on second-order effects (downstream consequences).
+- Recommendations must be practical de-risking steps (pilot, checkpoints, metrics, staged investment, etc.).
+- No extra keys, no markdown, no prose outside JSON.
+"""
+
+def _preamble(intent):
+    return _PREAMBLE.format(
+        decision=intent["decision"],
+        context=intent["context"],
+        signals=json.dumps(intent["signals"], indent=2),
+    )
+
+def build_request(intent, disagree_level):
+    """Keyword arguments for chat.completions.create (shared by every call path)."""
+    mode = LEVEL_MODES[disagree_level]
+
+    prompt = f"""{_preamble(intent)}
+Disagreement intensity: {disagree_level}/5 ({mode})
+
+Return ONLY valid JSON with this exact schema:
+{_SCHEMA}
+
+{_RULES}"""
+
+    # Temperature slightly increases with intensity for variety, but stays controlled.
+    temperature = 0.3 + (disagree_level * 0.08)
+
+    return dict(
+        model=OPENAI_MODEL,
+        messages=[{"role":"user", "content": prompt}],
+        temperature=temperature,
+        max_tokens=1000,
+    )
+
+def build_levels_request(intent):
+    """One request that answers for every intensity level 1-5 at once."""
+    levels = "\n".join(f"- {level}: {mode}" for level, mode in LEVEL_MODES.items())
+    schema = "{\n" + ",\n".join(f'  "{level}": ' + _SCHEMA.replace("\n", "\n  ") for level in LEVEL_MODES) + "\n}"
+
+    prompt = f"""{_preamble(intent)}
+Answer once for EACH disagreement intensity level:
+{levels}
+
+Return ONLY valid JSON with this exact schema (one object per level):
+{schema}
+
+{_RULES}"""
+
+    return dict(
+        model=OPENAI_MODEL,
+        messages=[{"role":"user", "content": prompt}],
+        temperature=0.5,  # middle of the single-level range
+        max_tokens=4000,
+    )
+
+def _cache_get(key):
+    cached = RESPONSE_CACHE.get(key)
+    metrics.CACHE_REQUESTS.inc("miss" if cached is None else "hit")
+    return cached
+
+def _has_sections(out):
+    """True for a complete single-level answer: every section present as a list."""
+    return isinstance(out, dict) and all(isinstance(out.get(section), list) for section in SECTIONS)
+
+def _has_all_levels(out):
+    return isinstance(out, dict) and all(_has_sections(out.get(str(level))) for level in LEVEL_MODES)
+
+def _cache_set(key, out, complete):
+    # Partial or off-schema answers are returned to the caller but never cached.
+    if complete(out):
+        RESPONSE_CACHE.set(key, out)
+
+async def _off_loop(fn, *args):
+    # The SQLite tier does blocking file I/O; keep it off the event loop.
+    if isinstance(RESPONSE_CACHE, TieredCache):
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+    return fn(*args)
+
+def _complete(key, complete, build, *args):
+    cached = _cache_get(key)
+    if cached is not None:
+        return copy.deepcopy(cached)
+
+    with span("llm.request"), metrics.llm_call("complete"):
+        resp = get_client().chat.completions.create(**build(*args))
+    metrics.count_tokens(getattr(resp, "usage", None))
+
+    out = parse_response(resp.choices[0].message.content)
+    _cache_set(key, out, complete)
+    return copy.deepcopy(out)
+
+async def _complete_async(key, complete, build, *args):
+    cached = await _off_loop(_cache_get, key)
+    if cached is not None:
+        return copy.deepcopy(cached)
+
+    with span("llm.request"), metrics.llm_call("complete"):
+        resp = await get_async_client().chat.completions.create(**build(*args))
+    metrics.count_tokens(getattr(resp, "usage", None))
+
+    out = parse_response(resp.choices[0].message.content)
+    await _off_loop(_cache_set, key, out, complete)
+    return copy.deepcopy(out)
+
+def openai_one_call(intent, disagree_level):
+    """
+    Makes a single LLM call and returns dict with keys:
+    - counterarguments: list[str]
+    - impacts: list[str]
+    - recommendations: list[str]
+    """
+    return _complete(response_cache_key(intent, disagree_level), _has_sections, build_request, intent, disagree_level)
+
+async def openai_one_call_async(intent, disagree_level):
+    """openai_one_call on the async client; cancelling the task aborts the HTTP request."""
+    return await _complete_async(response_cache_key(intent, disagree_level), _has_sections, build_request, intent, disagree_level)
+
+def _split_levels(out):
+    # {"1": {...}, ...} -> {1: {...}, ...}; levels the model skipped are left out.
+    if not isinstance(out, dict):
+        raise ValueError("expected a JSON object keyed by level")
+    return {level: out[str(level)] for level in LEVEL_MODES if isinstance(out.get(str(level)), dict)}
+
+def openai_all_levels(intent):
+    """One LLM call for all five levels: {level: {counterarguments, impacts, recommendations}}."""
+    return _split_levels(_complete(response_cache_key(intent, "all"), _has_all_levels, build_levels_request, intent))
+
+async def openai_all_levels_async(intent):
+    return _split_levels(await _complete_async(response_cache_key(intent, "all"), _has_all_levels, build_levels_request, intent))
+
+# Ask for a final usage chunk so streamed calls report tokens too.
+STREAM_OPTIONS = {"include_usage": True}
+
+def openai_one_call_stream(intent, disagree_level, first_item_timeout=None):
+    """
+    Streaming variant of openai_one_call. Yields (section, item) as each list
+    item completes, then returns the full parsed dict (StopIteration.value).
+    With first_item_timeout, raises TimeoutError if no item is complete after
+    that many seconds. The request then goes out without retries and with that
+    timeout per socket read, so a late first byte ends the call on time; text
+    that trickles in without completing an item is checked after each chunk.
+    """
+    key = response_cache_key(intent, disagree_level)
+    cached = _cache_get(key)
+    if cached is not None:
+        for section in SECTIONS:
+            for item in cached.get(section, []):
+                yield section, item
+        return copy.deepcopy(cached)
+
+    client = get_client()
+    expires = None
+    if first_item_timeout is not None:
+        client = client.with_options(max_retries=0, timeout=first_item_timeout)
+        expires = time.monotonic() + first_item_timeout
+    late = TimeoutError(f"no streamed item within {first_item_timeout}s")
+
+    try:
+        with span("llm.first_byte"), metrics.llm_call("stream"):
+            stream = client.chat.completions.create(**build_request(intent, disagree_level), stream=True, stream_options=STREAM_OPTIONS)
+    except Exception as e:
+        if expires is not None and _is_timeout(e):
+            raise late from e
+        raise
+
+    parser = ItemStream(SECTIONS)
+    try:
+        for text in _stream_text(stream):
+            events = parser.feed(text)
+            if events:
+                expires = None
+            elif expires is not None and time.monotonic() > expires:
+                raise late
+            yield from events
+    except Exception as e:
+        if expires is not None and _is_timeout(e):
+            raise late from e
+        raise
+    finally:
+        stream.close()
+    out = parser.close()
+    _cache_set(key, out, _has_sections)
+    return copy.deepcopy(out)
+
+def _is_timeout(error):
+    # openai wraps a timeout before the response starts; one while reading the
+    # stream surfaces as httpx's own (a replayed cassette raises TimeoutError).
+    # Neither module is imported just to check.
+    openai, httpx = sys.modules.get("openai"), sys.modules.get("httpx")
+    return (
+        isinstance(error, TimeoutError)
+        or (openai is not None and isinstance(error, openai.APITimeoutError))
+        or (httpx is not None and isinstance(error, httpx.TimeoutException))
+    )
+
+def _stream_text(stream):
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+        metrics.count_tokens(getattr(chunk, "usage", None))
+
+async def openai_one_call_stream_async(intent, disagree_level):
+    """
+    openai_one_call_stream on the async client, as an async generator of
+    (section, item). The parsed answer is cached once the object is complete;
+    an answer that never completes raises ValueError after its last item.
+    """
+    key = response_cache_key(intent, disagree_level)
+    cached = await _off_loop(_cache_get, key)
+    if cached is not None:
+        for section in SECTIONS:
+            for item in cached.get(section, []):
+                yield section, copy.deepcopy(item)
+        return
+
+    with span("llm.first_byte"), metrics.llm_call("stream"):
+        stream = await get_async_client().chat.completions.create(**build_request(intent, disagree_level), stream=True, stream_options=STREAM_OPTIONS)
+    parser = ItemStream(SECTIONS)
+    try:
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                for event in parser.feed(chunk.choices[0].delta.content):
+                    yield event
+            metrics.count_tokens(getattr(chunk, "usage", None))
+    finally:
+        await stream.close()
+    await _off_loop(_cache_set, key, parser.close(), _has_sections)
+
+def parse_response(raw):
+    """
+    Parses a complete model answer. Clean JSON takes the json.loads fast path;
+    otherwise the incremental parser finds the object inside surrounding prose.
+    Raises ValueError unless the answer is a JSON object.
+    """
+    raw = (raw or "").strip()
+    with span("parse"):
+        try:
+            out = json.loads(raw)
+        except ValueError:
+            pass
+        else:
+            if not isinstance(out, dict):
+                raise ValueError(f"expected a JSON object from the model, got {type(out).__name__}")
+            return out
+    with span("salvage"):
+        parser = ItemStream()
+        parser.feed(raw)
+        try:
+            out = parser.close()
+        except ValueError:
+            metrics.JSON_SALVAGE.inc("failed")
+            raise
+        metrics.JSON_SALVAGE.inc("ok")
+        return out
@@ -0,0 +1,263 @@
+"""
+Process metrics in the Prometheus text format, without a client library.
+
+Counters and log-linear ("HDR-style") latency histograms live in fixed-size
+structures: a histogram child is one preallocated list of bucket counts, and
+an observation is an O(1) bucket index (math.frexp, no search) plus a few
+integer adds under that child's own lock. Buckets cover 10 us to ~84 s with
+4 linear sub-buckets per power of two (<= 25% relative error), which is
+enough for histogram_quantile(0.99, ...) alerts.
+
+render() returns the exposition text. It is served on GET /metrics by
+disagree.server, or from a sidecar thread:
+
+    DISAGREE_METRICS_PORT=9108 streamlit run streamlit_app.py
+    curl -s localhost:9108/metrics
+"""
+import os
+import math
+import time
+import threading
+
+_registry = []
+_registry_lock = threading.Lock()
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(names, values, extra=""):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._children = {}
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    def _child(self, values):
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} takes labels {self.label_names}, got {values!r}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+class Counter(_Metric):
+    """Monotonic counter; inc(*label_values, amount=1)."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return [0, threading.Lock()]
+
+    def inc(self, *values, amount=1):
+        child = self._child(values)
+        with child[1]:
+            child[0] += amount
+
+    def value(self, *values):
+        child = self._children.get(values)
+        return child[0] if child else 0
+
+    def _render_child(self, values, child):
+        return [f"{self.name}{_labels(self.label_names, values)} {_number(child[0])}"]
+
+class _HistogramChild:
+    __slots__ = ("counts", "sum", "count", "lock")
+
+    def __init__(self, size):
+        self.counts = [0] * size  # last slot is the +Inf overflow
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+class Histogram(_Metric):
+    """
+    Log-linear histogram: `sub` buckets per power of two from `lowest` for
+    `octaves` doublings, plus +Inf. observe(seconds, *label_values).
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), lowest=1e-5, octaves=23, sub=4):
+        super().__init__(name, help, labels)
+        self.lowest = lowest
+        self.sub = sub
+        self.bounds = [lowest * 2 ** o * (1 + (j + 1) / sub) for o in range(octaves) for j in range(sub)]
+        self.bounds.append(math.inf)
+
+    def _new_child(self):
+        return _HistogramChild(len(self.bounds))
+
+    def index(self, value):
+        """Bucket index for value: the first bucket whose (inclusive) upper bound >= value."""
+        if value <= self.lowest * (1 + 1 / self.sub):
+            return 0
+        mantissa, exponent = math.frexp(value / self.lowest)  # value / lowest = mantissa * 2**exponent
+        i = (exponent - 1) * self.sub + math.ceil((mantissa * 2 - 1) * self.sub) - 1
+        return min(i, len(self.bounds) - 1)
+
+    def observe(self, value, *values):
+        i = self.index(value)
+        child = self._child(values)
+        with child.lock:
+            child.counts[i] += 1
+            child.sum += value
+            child.count += 1
+
+    def quantile(self, q, *values):
+        """Upper bound of the bucket holding the q-quantile (None if empty)."""
+        child = self._children.get(values)
+        if child is None or not child.count:
+            return None
+        with child.lock:
+            counts = list(child.counts)
+            total = child.count
+        rank, seen = q * total, 0
+        for bound, n in zip(self.bounds, counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return math.inf
+
+    def _render_child(self, values, child):
+        with child.lock:
+            counts, total, sum_ = list(child.counts), child.count, child.sum
+        lines, cumulative = [], 0
+        for bound, n in zip(self.bounds, counts):
+            cumulative += n
+            le = 'le="' + ("+Inf" if bound == math.inf else f"{bound:.6g}") + '"'
+            lines.append(f"{self.name}_bucket{_labels(self.label_names, values, le)} {cumulative}")
+        labels = _labels(self.label_names, values)
+        lines.append(f"{self.name}_sum{labels} {_number(sum_)}")
+        lines.append(f"{self.name}_count{labels} {total}")
+        return lines
+
+class timer:
+    """Context manager observing elapsed seconds into a histogram and counting the outcome."""
+
+    __slots__ = ("histogram", "counter", "values", "start")
+
+    def __init__(self, histogram, counter, *values):
+        self.histogram = histogram
+        self.counter = counter
+        self.values = values
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start, *self.values)
+        if exc_type is None:
+            outcome = "ok"
+        elif issubclass(exc_type, Exception):
+            outcome = "error"
+        else:
+            outcome = "cancelled"
+        self.counter.inc(*self.values, outcome)
+
+# -----------------------------
+# The app's metrics
+# -----------------------------
+SUBMITS = Counter("disagree_submits_total", "Analyses run, by mode.", ("mode",))
+SUBMIT_SECONDS = Histogram("disagree_submit_seconds", "End-to-end analysis latency in seconds, by mode.", ("mode",))
+FALLBACKS = Counter("disagree_llm_fallbacks_total", "OpenAI-mode analyses that fell back to templates, by reason.", ("reason",))
+LLM_CALLS = Counter("disagree_llm_calls_total", "LLM API calls, by kind and outcome.", ("kind", "outcome"))
+LLM_SECONDS = Histogram("disagree_llm_call_seconds", "LLM API latency in seconds: to the full answer, or to the first byte for streams.", ("kind",))
+JSON_SALVAGE = Counter("disagree_json_salvage_total", "Model answers that were not clean JSON and went to the tolerant parser, by outcome.", ("outcome",))
+CACHE_REQUESTS = Counter("disagree_llm_cache_requests_total", "LLM response cache lookups, by result.", ("result",))
+TOKENS = Counter("disagree_llm_tokens_total", "Tokens reported by the API, by type.", ("type",))
+
+def llm_call(kind):
+    return timer(LLM_SECONDS, LLM_CALLS, kind)
+
+def fallback_reason(llm_error):
+    if "did not answer within" in llm_error:
+        return "deadline"
+    if "OPENAI_API_KEY" in llm_error:
+        return "no_key"
+    return "error"
+
+def observe_submit(mode, start, llm_error=None):
+    SUBMITS.inc(mode)
+    SUBMIT_SECONDS.observe(time.perf_counter() - start, mode)
+    if llm_error:
+        FALLBACKS.inc(fallback_reason(llm_error))
+
+def count_tokens(usage):
+    if usage is None:
+        return
+    TOKENS.inc("prompt", amount=getattr(usage, "prompt_tokens", 0) or 0)
+    TOKENS.inc("completion", amount=getattr(usage, "completion_tokens", 0) or 0)
+
+# -----------------------------
+# Exposition
+# -----------------------------
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def render():
+    with _registry_lock:
+        metrics = list(_registry)
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+_sidecar = None
+_sidecar_lock = threading.Lock()
+
+def start_http_server(port, addr="0.0.0.0"):
+    """Serves GET /metrics from a daemon thread. Idempotent: later calls return the running server."""
+    global _sidecar
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("content-type", CONTENT_TYPE)
+            self.send_header("content-length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    with _sidecar_lock:
+        if _sidecar is None:
+            _sidecar = ThreadingHTTPServer((addr, port), Handler)
+            _sidecar.daemon_threads = True
+            threading.Thread(target=_sidecar.serve_forever, name="disagree-metrics", daemon=True).start()
+    return _sidecar
+
+def start_http_server_from_env():
+    """Starts the sidecar if DISAGREE_METRICS_PORT is set; returns it (or None)."""
+    port = os.getenv("DISAGREE_METRICS_PORT", "").strip()
+    if not port:
+        return None
+    return start_http_server(int(port), os.getenv("DISAGREE_METRICS_ADDR", "0.0.0.0"))
@@ -0,0 +1,119 @@
+"""
+Process-pool engine for re-scoring large archives with bias_detector and
+confidence_score.
+
+Work is shipped to workers in chunks (one pickle round-trip per chunk, not per
+decision). Each worker builds the compiled keyword tables once, at start-up,
+and at most a few chunks per worker are in flight so the input is streamed.
+
+    python -m disagree.parallel archive.jsonl -o scores.jsonl --workers 8
+"""
+import io
+import os
+import sys
+import json
+import argparse
+import itertools
+import collections
+import concurrent.futures
+
+from . import features
+
+def _init_worker():
+    # Importing disagree.text compiles the keyword regex; touch it so the cost
+    # lands here rather than inside the first chunk.
+    features.extract(["warm up"])
+
+def _score_chunk(start, chunk):
+    # One text scan per document, then both agents are projections of the bitsets.
+    pairs = [pair for pair in chunk if pair is not None]
+    fm = features.extract([d for d, _ in pairs], [c for _, c in pairs])
+    scores = iter(zip(features.biases(fm), features.confidence(fm)))
+    return start, [(None, None) if pair is None else next(scores) for pair in chunk]
+
+def _chunks(records, chunksize):
+    it = iter(records)
+    start = 0
+    while True:
+        chunk = list(itertools.islice(it, chunksize))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+def score_corpus(records, workers=None, chunksize=1000, ordered=True, max_pending=None):
+    """
+    Scores an iterable of (decision, context) pairs across processes.
+    Yields (index, biases, confidence); a None record keeps its index and
+    yields (index, None, None). ordered=False yields chunks as soon as they
+    finish, which keeps all cores busy when chunk costs vary.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 2
+    pending = collections.deque()
+
+    def drain():
+        if ordered:
+            yield pending.popleft().result()
+            return
+        done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            pending.remove(future)
+            yield future.result()
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for start, chunk in _chunks(records, chunksize):
+            pending.append(pool.submit(_score_chunk, start, chunk))
+            while len(pending) >= max_pending:
+                for start_, scores in drain():
+                    for offset, (biases, conf) in enumerate(scores):
+                        yield start_ + offset, biases, conf
+        while pending:
+            for start_, scores in drain():
+                for offset, (biases, conf) in enumerate(scores):
+                    yield start_ + offset, biases, conf
+
+def main(argv=None):
+    from .batch import FORMATS, guess_format, read_rows
+
+    parser = argparse.ArgumentParser(prog="python -m disagree.parallel", description="Re-score a large decision archive (biases + confidence) on all cores.")
+    parser.add_argument("input", help="CSV or JSONL file with decision and context columns ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output ('-' for stdout, the default)")
+    parser.add_argument("--input-format", choices=FORMATS)
+    parser.add_argument("--workers", type=int, default=None, help="default: one per CPU")
+    parser.add_argument("--chunksize", type=int, default=1000)
+    parser.add_argument("--unordered", action="store_true", help="write rows as chunks finish instead of in input order")
+    args = parser.parse_args(argv)
+
+    fin = sys.stdin if args.input == "-" else io.open(args.input, encoding="utf-8", newline="")
+    fout = sys.stdout if args.output == "-" else io.open(args.output, "w", encoding="utf-8")
+    count = 0
+    try:
+        rows = read_rows(fin, args.input_format or guess_format(args.input))
+        errors = {}  # unreadable rows still in flight: index -> message
+
+        def pairs():
+            for index, row in enumerate(rows):
+                if "error" in row:
+                    errors[index] = row["error"]
+                    yield None
+                else:
+                    yield row["decision"], row["context"]
+
+        for index, biases, conf in score_corpus(pairs(), args.workers, args.chunksize, ordered=not args.unordered):
+            if index in errors:
+                record = {"row": index, "error": errors.pop(index)}
+            else:
+                record = {"row": index, "biases": biases, "confidence": conf}
+            fout.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+    finally:
+        if fin is not sys.stdin:
+            fin.close()
+        if fout is not sys.stdout:
+            fout.close()
+    print(f"{count} rows", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,289 @@
+"""
+HTTP analysis service (plain ASGI, no web framework).
+
+    POST /analyze        {"decision": "...", "context": "...", "level": 3, "mode": "template"}
+    POST /analyze/batch  {"items": [{...}, ...]}   (or a bare JSON list)
+    POST /analyze/stream {"decision": "...", ...}   (or GET with query params, for EventSource)
+    GET  /healthz
+    GET  /metrics        (Prometheus text format, see disagree.metrics)
+
+/analyze/stream answers with server-sent events: "template" (the heuristic
+result), then one "counterarguments" / "impacts" / "recommendations" event per
+LLM item as it is parsed, then "done" with the final result (confidence,
+biases, and llm_error if the call failed). Its mode defaults to "openai";
+with "mode": "template" the stream is just "template" then "done".
+
+Heuristics run on a thread pool so the event loop only does I/O; the LLM path
+is awaited on the loop (async client, deadline from DISAGREE_LLM_DEADLINE) with
+at most SERVER_LLM_CONCURRENCY calls in flight. Serve it with any ASGI server:
+
+    pip install uvicorn
+    python -m disagree.server --port 8000
+"""
+import os
+import sys
+import json
+import asyncio
+import argparse
+import urllib.parse
+import concurrent.futures
+
+from . import metrics
+from .batch import parse_row
+from .engine import analyze_async, analyze_stream_async
+
+MAX_BODY_BYTES = int(os.getenv("SERVER_MAX_BODY_BYTES", str(1024 * 1024)))
+MAX_BATCH_ITEMS = int(os.getenv("SERVER_MAX_BATCH_ITEMS", "200"))
+MAX_DECISION_CHARS = int(os.getenv("SERVER_MAX_DECISION_CHARS", "200000"))
+CPU_WORKERS = int(os.getenv("SERVER_CPU_WORKERS", str(min(8, os.cpu_count() or 1))))
+LLM_CONCURRENCY = int(os.getenv("SERVER_LLM_CONCURRENCY", "64"))
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+_cpu_pool = None
+_llm_slots = None
+
+def _state():
+    # Created lazily inside the serving loop (semaphores bind to their loop).
+    global _cpu_pool, _llm_slots
+    if _cpu_pool is None:
+        _cpu_pool = concurrent.futures.ThreadPoolExecutor(CPU_WORKERS, thread_name_prefix="disagree-cpu")
+    if _llm_slots is None:
+        _llm_slots = asyncio.Semaphore(LLM_CONCURRENCY)
+    return _cpu_pool, _llm_slots
+
+# -----------------------------
+# Request handling
+# -----------------------------
+def parse_item(item, default_mode="template"):
+    # The same field rules as batch and CLI rows, plus a non-empty decision.
+    if not isinstance(item, dict):
+        raise HTTPError(400, "each request must be a JSON object")
+    try:
+        row = parse_row(item, mode=default_mode)
+    except ValueError as e:
+        raise HTTPError(400, str(e))
+    if not row["decision"].strip():
+        raise HTTPError(400, "'decision' must be a non-empty string")
+    if len(row["decision"]) + len(row["context"]) > MAX_DECISION_CHARS:
+        raise HTTPError(413, f"decision + context exceed {MAX_DECISION_CHARS} characters")
+    return row["decision"], row["context"], row["level"], row["mode"]
+
+async def analyze_item(item):
+    decision, context, level, mode = parse_item(item)
+    pool, slots = _state()
+    if mode == "openai":
+        async with slots:
+            result = await analyze_async(decision, context, level, mode, executor=pool)
+    else:
+        result = await analyze_async(decision, context, level, mode, executor=pool)
+    return result.to_dict()
+
+async def handle_analyze(body):
+    return 200, await analyze_item(body)
+
+async def handle_batch(body):
+    items = body.get("items") if isinstance(body, dict) else body
+    if not isinstance(items, list):
+        raise HTTPError(400, "expected {'items': [...]} or a JSON list")
+    if len(items) > MAX_BATCH_ITEMS:
+        raise HTTPError(413, f"at most {MAX_BATCH_ITEMS} items per batch")
+
+    async def one(item):
+        try:
+            return await analyze_item(item)
+        except HTTPError as e:
+            return {"error": e.message}
+
+    return 200, {"results": await asyncio.gather(*(one(item) for item in items))}
+
+ROUTES = {
+    ("POST", "/analyze"): handle_analyze,
+    ("POST", "/analyze/batch"): handle_batch,
+}
+STREAM_PATH = "/analyze/stream"
+
+def query_item(query_string):
+    query = urllib.parse.parse_qs(query_string.decode("latin-1"))
+    return {key: values[-1] for key, values in query.items()}  # level stays a string, as in CSV
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+
+async def stream_analysis(send, item):
+    decision, context, level, mode = parse_item(item, default_mode="openai")
+    pool, slots = _state()
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [
+            (b"content-type", b"text/event-stream; charset=utf-8"),
+            (b"cache-control", b"no-cache"),
+            (b"x-accel-buffering", b"no"),  # stop nginx from buffering the stream
+        ],
+    })
+
+    async def emit(event, payload):
+        if event in ("template", "done"):
+            payload = payload.to_dict()
+        await send({"type": "http.response.body", "body": sse_event(event, payload), "more_body": True})
+
+    if mode == "template":
+        result = await analyze_async(decision, context, level, mode, executor=pool)
+        await emit("template", result)
+        await emit("done", result)
+    else:
+        events = analyze_stream_async(decision, context, level, executor=pool)
+        try:
+            # The template goes out before waiting for an LLM slot; only the call holds one.
+            await emit(*await events.__anext__())
+            async with slots:
+                async for event, payload in events:
+                    await emit(event, payload)
+        finally:
+            await events.aclose()
+    await send({"type": "http.response.body", "body": b""})
+
+async def until_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+async def serve_stream(scope, receive, send):
+    # The LLM call is cancelled as soon as the client goes away.
+    if scope["method"] == "GET":
+        item = query_item(scope.get("query_string", b""))
+    else:
+        raw = await read_body(receive)
+        try:
+            item = json.loads(raw or b"null")
+        except ValueError:
+            raise HTTPError(400, "request body must be JSON")
+    parse_item(item, default_mode="openai")  # reject bad input with a plain 4xx before the stream starts
+
+    producer = asyncio.ensure_future(stream_analysis(send, item))
+    watcher = asyncio.ensure_future(until_disconnect(receive))
+    try:
+        await asyncio.wait((producer, watcher), return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        watcher.cancel()
+        if not producer.done():
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+    if not producer.cancelled():
+        producer.result()  # re-raise anything unexpected
+
+# -----------------------------
+# ASGI plumbing
+# -----------------------------
+async def read_body(receive):
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise HTTPError(400, "client disconnected")
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise HTTPError(413, f"request body exceeds {MAX_BODY_BYTES} bytes")
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+async def send_json(send, status, payload, headers=()):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json; charset=utf-8"),
+            (b"content-length", str(len(body)).encode()),
+            *headers,
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            _state()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            if _cpu_pool is not None:
+                _cpu_pool.shutdown(wait=False)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await lifespan(receive, send)
+    if scope["type"] != "http":
+        return
+
+    method, path = scope["method"], scope["path"].rstrip("/") or "/"
+    if method == "GET" and path == "/healthz":
+        return await send_json(send, 200, {"status": "ok"})
+    if method == "GET" and path == "/metrics":
+        body = metrics.render().encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", metrics.CONTENT_TYPE.encode()), (b"content-length", str(len(body)).encode())],
+        })
+        return await send({"type": "http.response.body", "body": body})
+
+    if path == STREAM_PATH and method in ("GET", "POST"):
+        try:
+            return await serve_stream(scope, receive, send)
+        except HTTPError as e:
+            return await send_json(send, e.status, {"error": e.message})
+
+    handler = ROUTES.get((method, path))
+    if handler is None:
+        allowed = path == STREAM_PATH or any(p == path for _, p in ROUTES)
+        return await send_json(send, 405 if allowed else 404, {"error": "method not allowed" if allowed else "not found"})
+
+    try:
+        raw = await read_body(receive)
+        try:
+            body = json.loads(raw or b"null")
+        except ValueError:
+            raise HTTPError(400, "request body must be JSON")
+        status, payload = await handler(body)
+    except HTTPError as e:
+        status, payload = e.status, {"error": e.message}
+    await send_json(send, status, payload)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m disagree.server", description="Serve the disagreement engine over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1, help="server processes")
+    parser.add_argument("--keep-alive", type=int, default=30, help="idle keep-alive timeout in seconds")
+    parser.add_argument("--limit-concurrency", type=int, default=2000, help="connections before new ones get 503")
+    args = parser.parse_args(argv)
+
+    try:
+        import uvicorn
+    except ImportError:
+        print("The HTTP service needs an ASGI server: pip install uvicorn", file=sys.stderr)
+        return 1
+
+    uvicorn.run(
+        "disagree.server:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_keep_alive=args.keep_alive,
+        limit_concurrency=args.limit_concurrency,
+        backlog=4096,
+        access_log=False,
+    )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
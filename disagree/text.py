@@ -0,0 +1,153 @@
+"""
+Text normalization and keyword matching shared by every agent.
+"""
+import re
+import functools
+
+def contains_any(text, keywords):
+    t = (text or "").lower()
+    return any(k in t for k in keywords)
+
+def count_numbers(text):
+    # Just the number regex: no need for a full (cached) analyze_text pass.
+    return len(NUMBER_RE.findall(normalize_quotes(text)))
+
+# -----------------------------
+# Keyword rules (compiled once into a single matcher)
+# -----------------------------
+KEYWORD_GROUPS = {
+    # intent signals
+    "urgency": ["asap", "immediately", "right away", "urgent"],
+    "scale": ["scale", "roll out", "rollout", "expand", "enterprise-wide"],
+    "certainty": ["no-brainer", "sure", "guaranteed", "can't fail"],
+    # bias signals
+    "groupthink": ["everyone", "obvious", "clearly"],
+    "haste": ["quick", "fast", "asap", "immediately"],
+    "sunk_cost": ["we've already invested", "sunk cost", "too much to stop"],
+    # confidence score
+    "evidence": ["because", "due to", "based on", "data", "analysis", "pilot", "experiment", "evidence"],
+    "risk_denial": ["no-brainer", "guaranteed", "can't fail", "zero risk", "no risk"],
+    # template generators
+    "launch": ["launch", "rollout", "ship", "release"],
+    "spend": ["marketing", "campaign", "spend"],
+    "budget": ["budget", "$", "limited"],
+    "delivery": ["launch", "rollout", "ship", "release", "scale", "expand"],
+    "integration": ["integration", "integrations", "platform", "systems"],
+}
+
+def _trie_regex(phrases):
+    # Factor shared prefixes so the regex engine walks a trie instead of
+    # retrying every phrase at every position.
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def walk(node):
+        branches = [re.escape(ch) + walk(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return walk(trie)
+
+def compile_keyword_groups(groups):
+    """
+    Builds a matcher for a {group: [phrases]} table.
+    Returns (regex, phrase_groups) where phrase_groups maps every phrase the regex
+    can report to the groups it satisfies.
+    """
+    phrase_groups = {}
+    for group, phrases in groups.items():
+        for phrase in phrases:
+            phrase_groups.setdefault(normalize_text(phrase), set()).add(group)
+
+    # The regex reports the longest phrase starting at each position; fold in the
+    # groups of any shorter phrase that is a prefix of it so substring semantics
+    # match `k in text` exactly.
+    closed = {}
+    for phrase in phrase_groups:
+        hit = set()
+        for i in range(1, len(phrase) + 1):
+            hit |= phrase_groups.get(phrase[:i], set())
+        closed[phrase] = frozenset(hit)
+
+    # Lookahead makes matches overlap, so a phrase inside another is still found.
+    regex = re.compile("(?=(" + _trie_regex(closed) + "))")
+    return regex, closed
+
+# -----------------------------
+# Shared normalize-and-tokenize pass
+# -----------------------------
+QUOTE_MAP = str.maketrans({"’": "'", "‘": "'", "“": '"', "”": '"'})
+NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+TOKEN_RE = re.compile(r"\w+(?:['-]\w+)*|\$")
+
+def normalize_quotes(text):
+    return (text or "").translate(QUOTE_MAP)
+
+def normalize_text(text):
+    return normalize_quotes(text).casefold()
+
+KEYWORD_REGEX, PHRASE_GROUPS = compile_keyword_groups(KEYWORD_GROUPS)
+
+# One bit per keyword group, so a text's hits pack into a single int.
+GROUP_BITS = {group: 1 << i for i, group in enumerate(KEYWORD_GROUPS)}
+PHRASE_MASKS = {phrase: sum(GROUP_BITS[g] for g in groups) for phrase, groups in PHRASE_GROUPS.items()}
+
+def groups_in(mask):
+    return frozenset(group for group, bit in GROUP_BITS.items() if mask & bit)
+
+def keyword_mask(text):
+    """GROUP_BITS of the groups whose phrases occur in already-normalized text."""
+    mask = 0
+    for m in KEYWORD_REGEX.finditer(text):
+        mask |= PHRASE_MASKS[m.group(1)]
+    return mask
+
+class AnalyzedText:
+    """
+    Everything the agents need from one piece of input, computed once:
+    - raw: the stripped input, as the user wrote it
+    - text: casefolded with curly quotes normalized
+    - numbers: (start, end) spans of numbers in `text`
+    - mask: GROUP_BITS of the keyword groups that fire
+    - hits: the same groups as a frozenset of names
+    - tokens: (start, end) word offsets in `text` (computed on first use)
+    """
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.text = normalize_text(raw)
+        self.numbers = [m.span() for m in NUMBER_RE.finditer(self.text)]
+        self.mask = keyword_mask(self.text)
+
+    @functools.cached_property
+    def hits(self):
+        return groups_in(self.mask)
+
+    @functools.cached_property
+    def tokens(self):
+        return [m.span() for m in TOKEN_RE.finditer(self.text)]
+
+    def __repr__(self):
+        return f"AnalyzedText({self.raw[:40]!r}, hits={sorted(self.hits)})"
+
+@functools.lru_cache(maxsize=256)
+def _analyze_text(raw):
+    return AnalyzedText(raw)
+
+def analyze_text(text):
+    """
+    Returns the AnalyzedText for `text` (a str or an AnalyzedText).
+    Memoized on the stripped string, so agents handed the same decision share one pass.
+    """
+    if isinstance(text, AnalyzedText):
+        return text
+    return _analyze_text((text or "").strip())
+
+def keyword_hits(text):
+    return analyze_text(text).hits
@@ -0,0 +1,154 @@
+"""
+Per-stage timing spans.
+
+    from disagree import timing
+    timing.enable()
+    with timing.trace("submit") as t:
+        analyze(...)
+    t.breakdown()   # [{"stage": "intent", "start_ms": 0.0, "ms": 0.4}, ...]
+    timing.stats()  # rolling p50/p95/p99 per stage for the process
+
+Spans use the monotonic perf_counter clock. Off by default (DISAGREE_TIMING=1
+or enable() turns it on); when off, span() returns a shared no-op context
+manager, so instrumented code pays one function call per stage. The current
+trace lives in a contextvar, so concurrent requests (Streamlit sessions,
+server tasks) each see only their own spans.
+"""
+import os
+import time
+import threading
+import contextvars
+import collections
+
+ENABLED = os.getenv("DISAGREE_TIMING", "") not in ("", "0")
+# Samples per stage kept for the rolling percentiles.
+WINDOW = int(os.getenv("DISAGREE_TIMING_WINDOW", "1000"))
+
+clock = time.perf_counter
+
+_current = contextvars.ContextVar("disagree_trace", default=None)
+_samples = {}
+_samples_lock = threading.Lock()
+
+def enable(on=True):
+    global ENABLED
+    ENABLED = on
+
+class Trace:
+    """Spans recorded while this trace was current: (stage, start offset, duration) in seconds."""
+
+    __slots__ = ("name", "start", "spans", "total")
+
+    def __init__(self, name):
+        self.name = name
+        self.start = clock()
+        self.spans = []
+        self.total = None
+
+    def breakdown(self):
+        return [
+            {"stage": stage, "start_ms": round(offset * 1000, 3), "ms": round(seconds * 1000, 3)}
+            for stage, offset, seconds in self.spans
+        ]
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = clock()
+        return self
+
+    def __exit__(self, *exc):
+        end = clock()
+        _record(self.name, self.start, end - self.start)
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return None
+
+_NULL_SPAN = _NullSpan()
+
+def span(name):
+    """Context manager timing one stage."""
+    if not ENABLED:
+        return _NULL_SPAN
+    return _Span(name)
+
+def _record(name, start, seconds):
+    trace = _current.get()
+    if trace is not None:
+        trace.spans.append((name, start - trace.start, seconds))
+    _add_sample(name, seconds)
+
+def _add_sample(name, seconds):
+    with _samples_lock:
+        window = _samples.get(name)
+        if window is None:
+            window = _samples[name] = collections.deque(maxlen=WINDOW)
+        window.append(seconds)
+
+class trace:
+    """
+    Context manager collecting the spans of one request; `as` gives the Trace
+    (None when timing is off). Its total is also kept as a stage named `name`.
+    """
+
+    __slots__ = ("name", "_trace", "_token")
+
+    def __init__(self, name="request"):
+        self.name = name
+        self._trace = None
+
+    def __enter__(self):
+        if ENABLED:
+            self._trace = Trace(self.name)
+            self._token = _current.set(self._trace)
+        return self._trace
+
+    def __exit__(self, *exc):
+        t = self._trace
+        if t is not None:
+            _current.reset(self._token)
+            t.total = clock() - t.start
+            _add_sample(self.name, t.total)
+
+def bind(coro):
+    """Runs coro (e.g. on the background loop) with the caller's current trace."""
+    t = _current.get()
+    if t is None:
+        return coro
+
+    async def bound():
+        _current.set(t)
+        return await coro
+
+    return bound()
+
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, round(q / 100 * (len(ordered) - 1)))]
+
+def stats():
+    """{stage: {"count", "p50", "p95", "p99", "max"}} in ms over the last WINDOW samples."""
+    with _samples_lock:
+        snapshot = {name: sorted(window) for name, window in _samples.items()}
+    return {
+        name: {
+            "count": len(ordered),
+            **{f"p{q}": round(_percentile(ordered, q) * 1000, 3) for q in (50, 95, 99)},
+            "max": round(ordered[-1] * 1000, 3),
+        }
+        for name, ordered in snapshot.items()
+        if ordered
+    }
+
+def reset():
+    with _samples_lock:
+        _samples.clear()
@@ -0,0 +1,44 @@
+"""
+Vectorized confidence scoring for batches (requires numpy).
+
+confidence_score() is an additive rule over a handful of per-decision features.
+Here a batch is turned into an N x len(CONFIDENCE_FEATURES) matrix once (from
+the shared features.extract() bitsets), and the weights and clamps run as
+whole-array NumPy operations.
+"""
+import numpy as np
+
+from .text import GROUP_BITS
+from .agents import BASE_SCORE, FLAG_WEIGHTS, NUMBER_CAP, NUMBER_WEIGHT, SHORT_CONTEXT_CHARS, SHORT_DECISION_CHARS
+from .features import N_GROUPS, extract
+
+# Column order of the feature matrix: the number count, then agents.FLAG_WEIGHTS' flags.
+CONFIDENCE_FEATURES = ("numbers", *FLAG_WEIGHTS)
+_FLAG_WEIGHTS = np.array(list(FLAG_WEIGHTS.values()), dtype=np.int32)
+
+def confidence_features(decisions, contexts=None, fm=None):
+    """
+    Feature matrix (int32, one row per decision) in CONFIDENCE_FEATURES order,
+    projected from the shared bitset matrix (pass fm to reuse an extract()).
+    """
+    fm = extract(decisions, contexts) if fm is None else fm
+    masks = np.asarray(fm.masks, dtype=np.uint64)
+    both = (masks & np.uint64((1 << N_GROUPS) - 1)) | (masks >> np.uint64(N_GROUPS)) | np.asarray(fm.join_masks, dtype=np.uint64)
+    out = np.empty((len(fm), len(CONFIDENCE_FEATURES)), dtype=np.int32)
+    out[:, 0] = np.asarray(fm.numbers)
+    out[:, 1] = (both & np.uint64(GROUP_BITS["evidence"])) != 0
+    out[:, 2] = (both & np.uint64(GROUP_BITS["risk_denial"])) != 0
+    out[:, 3] = np.asarray(fm.decision_len) < SHORT_DECISION_CHARS
+    out[:, 4] = np.asarray(fm.context_len) < SHORT_CONTEXT_CHARS
+    return out
+
+def confidence_scores_from_features(features):
+    """Applies confidence_score's weights and clamps to a whole feature matrix."""
+    features = np.asarray(features, dtype=np.int32)
+    score = BASE_SCORE + np.clip(features[:, 0] * NUMBER_WEIGHT, 0, NUMBER_CAP)
+    score += features[:, 1:] @ _FLAG_WEIGHTS
+    return np.clip(score, 0, 100)
+
+def confidence_scores(decisions, contexts=None, fm=None):
+    """Same values as confidence_score(d, c) for each pair, as an int32 array."""
+    return confidence_scores_from_features(confidence_features(decisions, contexts, fm))
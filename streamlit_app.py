@@ -1,221 +1,17 @@
-import os
-import re
-import json
-import streamlit as st
-
-# Optional OpenAI (single-call) integration
-# Streamlit Cloud: set Secrets -> OPENAI_API_KEY="..."
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "").strip()
-HAS_OPENAI = bool(OPENAI_API_KEY)
-
-def clamp(n, lo, hi):
-    return max(lo, min(hi, n))
-
-def contains_any(text, keywords):
-    t = (text or "").lower()
-    return any(k in t for k in keywords)
-
-def count_numbers(text):
-    return len(re.findall(r"\b\d+(\.\d+)?\b", text or ""))
-
-# -----------------------------
-# Agent 1: Intent Decoder (POC heuristic)
-# -----------------------------
-def intent_decoder(decision_text, context=""):
-    text = (decision_text or "").strip()
-    ctx = (context or "").strip()
-
-    timeframe = "Not specified"
-    m = re.search(r"\b(in|within|over)\s+(\d+)\s+(day|days|week|weeks|month|months|quarter|quarters|year|years)\b", text.lower())
-    if m:
-        timeframe = f"{m.group(2)} {m.group(3)}"
-
-    return {
-        "decision": text,
-        "context": ctx,
-        "timeframe": timeframe,
-        "signals": {
-            "urgency": contains_any(text, ["asap", "immediately", "right away", "urgent"]),
-            "scale": contains_any(text, ["scale", "roll out", "rollout", "expand", "enterprise-wide"]),
-            "certainty": contains_any(text, ["no-brainer", "sure", "guaranteed", "can’t fail", "can't fail"]),
-        },
-    }
-
-# -----------------------------
-# Agent 2: Bias Detector (POC heuristic)
-# -----------------------------
-def bias_detector(intent):
-    text = intent["decision"].lower()
-    flags = []
+import io
+import tempfile
 
-    if contains_any(text, ["no-brainer", "sure", "guaranteed", "can’t fail", "can't fail"]):
-        flags.append("Overconfidence bias")
-    if contains_any(text, ["everyone", "obvious", "clearly"]):
-        flags.append("Social proof / groupthink")
-    if contains_any(text, ["quick", "fast", "asap", "immediately"]):
-        flags.append("Optimism / planning fallacy")
-    if contains_any(text, ["we've already invested", "sunk cost", "too much to stop"]):
-        flags.append("Sunk cost fallacy")
-
-    if not flags:
-        flags.append("No strong bias detected (based on visible signals)")
-
-    return flags
-
-# -----------------------------
-# Confidence Score (POC heuristic)
-# -----------------------------
-def confidence_score(decision_text, context_text):
-    text = (decision_text or "") + " " + (context_text or "")
-    t = text.lower()
-
-    score = 75
-    nums = count_numbers(text)
-    score += clamp(nums * 4, 0, 20)
-
-    if contains_any(t, ["because", "due to", "based on", "data", "analysis", "pilot", "experiment", "evidence"]):
-        score += 10
-
-    if contains_any(t, ["no-brainer", "guaranteed", "can't fail", "can’t fail", "zero risk", "no risk"]):
-        score -= 15
-
-    if len((decision_text or "").strip()) < 40:
-        score -= 10
-    if len((context_text or "").strip()) < 20:
-        score -= 5
-
-    return clamp(score, 0, 100)
-
-# -----------------------------
-# Template mode (no LLM)
-# -----------------------------
-def counterargument_generator(intent, disagree_level):
-    text = intent["decision"].lower()
-    ctx = intent["context"].lower()
-
-    counters = []
-
-    if contains_any(text, ["launch", "rollout", "ship", "release"]):
-        counters.append("Launching on an aggressive timeline increases execution risk and reduces time for validation.")
-    if intent["signals"]["scale"]:
-        counters.append("Scaling before validating assumptions can amplify losses and create operational/technical debt.")
-    if intent["signals"]["urgency"]:
-        counters.append("Urgency can crowd out risk discovery—what critical unknowns are you skipping because of time pressure?")
-    if contains_any(text, ["marketing", "campaign", "spend"]):
-        counters.append("Upfront spend can create commitment bias—consider staged investment tied to measurable outcomes.")
-    if intent["signals"]["certainty"]:
-        counters.append("High certainty may be masking untested assumptions—what evidence would change your mind?")
-
-    if contains_any(ctx, ["budget", "$", "limited"]):
-        counters.append("With a constrained budget, downside scenarios matter more—what if adoption is 50% of forecast?")
-
-    if not counters:
-        counters.append("The decision may be underestimating uncertainty and external dependencies (people, vendors, systems, approvals).")
-
-    hard_additions = [
-        "Pre-mortem: assume this fails in 6 months—what is the most likely reason?",
-        "If your key assumption is wrong, what irreversible cost (reputation, money, talent) do you incur?",
-    ]
-    if disagree_level >= 3:
-        counters.append(hard_additions[0])
-    if disagree_level >= 5:
-        counters.append(hard_additions[1])
-
-    # Make levels visibly different
-    max_n = {1: 2, 2: 3, 3: 4, 4: 5, 5: 6}[disagree_level]
-    return counters[:max_n]
-
-def second_order_impacts(intent, disagree_level):
-    text = intent["decision"].lower()
-    impacts = []
-
-    if contains_any(text, ["launch", "rollout", "ship", "release", "scale", "expand"]):
-        impacts.append("Operational load may spike faster than team capacity, increasing failure rate and burnout.")
-    if contains_any(text, ["integration", "integrations", "platform", "systems"]):
-        impacts.append("Integration delays can cascade into missed timelines and budget overruns.")
-    impacts.append("If early outcomes disappoint, reversing course may be reputationally costly.")
-    impacts.append("Short-term optimization may reduce long-term optionality (harder pivots, locked-in commitments).")
-    if disagree_level >= 4:
-        impacts.append("Stakeholder trust can degrade if timelines are missed—slowing approvals for future initiatives.")
-
-    return impacts
-
-def derisk_recommendations(disagree_level):
-    recs = [
-        "Run a time-bound pilot to validate key assumptions before full commitment.",
-        "Define explicit go/no-go criteria (metrics, thresholds, owners, dates).",
-        "Stage funding/spend in tranches tied to outcomes rather than upfront commitments.",
-        "Add a decision checkpoint before any irreversible investment (contracts, major hiring, public commitments).",
-    ]
-    return recs[: (3 if disagree_level <= 3 else 4)]
-
-# -----------------------------
-# OpenAI single-call (Counterarguments + Impacts + Recommendations in one shot)
-# -----------------------------
-def openai_one_call(intent, disagree_level):
-    """
-    Makes a single LLM call and returns dict with keys:
-    - counterarguments: list[str]
-    - impacts: list[str]
-    - recommendations: list[str]
-    """
-    # Lazy import so template mode works even if openai isn't installed.
-    from openai import OpenAI
-    client = OpenAI(api_key=OPENAI_API_KEY)
-
-    mode = {1:"gentle",2:"constructive",3:"devils_advocate",4:"hard_pushback",5:"brutally_honest"}[disagree_level]
-
-    prompt = f"""
-You are a constructive devil's advocate AI. Your job is to CHALLENGE a human decision, not to decide for them.
-
-Decision:
-{intent['decision']}
-
-Context:
-{intent['context']}
-
-Parsed signals:
-{json.dumps(intent['signals'], indent=2)}
-
-Disagreement intensity: {disagree_level}/5 ({mode})
-
-Return ONLY valid JSON with this exact schema:
-{{
-  "counterarguments": ["..."],
-  "impacts": ["..."],
-  "recommendations": ["..."]
-}}
-
-Rules:
-- Be specific to the decision and context.
-- Counterarguments should increase in sharpness with intensity.
-- Impacts should focus on second-order effects (downstream consequences).
-- Recommendations must be practical de-risking steps (pilot, checkpoints, metrics, staged investment, etc.).
-- No extra keys, no markdown, no prose outside JSON.
-"""
-
-    # Temperature slightly increases with intensity for variety, but stays controlled.
-    temperature = 0.3 + (disagree_level * 0.08)
-
-    resp = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role":"user", "content": prompt}],
-        temperature=temperature,
-        max_tokens=1000,
-    )
+import streamlit as st
 
-    raw = resp.choices[0].message.content.strip()
+from disagree import analyze, analyze_levels, analyze_stream, metrics, timing
+from disagree.cache import content_key
+from disagree.batch import guess_format, read_rows, run_batch, ResultWriter
+from disagree.llm import HAS_OPENAI
 
-    # Robust JSON parse (strip accidental leading/trailing text if any)
-    try:
-        return json.loads(raw)
-    except Exception:
-        # Try to salvage JSON if the model wrapped it with text
-        start = raw.find("{")
-        end = raw.rfind("}")
-        if start != -1 and end != -1 and end > start:
-            return json.loads(raw[start:end+1])
-        raise
+# Per-stage spans for the Performance panel (a few hundred ns per stage).
+timing.enable()
+# Prometheus /metrics on DISAGREE_METRICS_PORT, if set (started once per process).
+metrics.start_http_server_from_env()
 
 # -----------------------------
 # Streamlit UI
@@ -243,67 +39,217 @@ with st.form("decision_form"):
         help="Controls how strongly the system challenges the decision.",
     )
     use_openai = st.checkbox("Use OpenAI (single call) for smarter outputs", value=False, disabled=not HAS_OPENAI)
+    stream_openai = st.checkbox("Stream OpenAI output as it arrives", value=True, disabled=not HAS_OPENAI)
+    all_levels = st.checkbox("Precompute all five levels (switch levels afterwards without re-running)", value=False)
     submitted = st.form_submit_button("Challenge My Decision")
 
 if not HAS_OPENAI:
     st.info("Tip: To enable OpenAI mode on Streamlit Cloud, add OPENAI_API_KEY in App Settings → Secrets.")
 
-if submitted:
-    mode_label = {1:"Gentle nudge 🤝",2:"Constructive challenge 🧐",3:"Devil’s advocate 😈",4:"Hard pushback ⚠️",5:"Brutally honest 🔥"}[disagree_level]
-    st.info(f"Disagreement mode: **{mode_label}**")
-
-    intent = intent_decoder(decision_text, context_text)
-    biases = bias_detector(intent)
-    conf = confidence_score(decision_text, context_text)
-
-    # Generate outputs
-    llm_error = None
-    if use_openai and HAS_OPENAI:
-        try:
-            out = openai_one_call(intent, disagree_level)
-            counterargs = out.get("counterarguments", [])
-            impacts = out.get("impacts", [])
-            recs = out.get("recommendations", [])
-        except Exception as e:
-            llm_error = str(e)
-            counterargs = counterargument_generator(intent, disagree_level)
-            impacts = second_order_impacts(intent, disagree_level)
-            recs = derisk_recommendations(disagree_level)
-    else:
-        counterargs = counterargument_generator(intent, disagree_level)
-        impacts = second_order_impacts(intent, disagree_level)
-        recs = derisk_recommendations(disagree_level)
+MODE_LABELS = {1:"Gentle nudge 🤝",2:"Constructive challenge 🧐",3:"Devil’s advocate 😈",4:"Hard pushback ⚠️",5:"Brutally honest 🔥"}
 
+def results_layout():
+    """Lays out the results columns and returns their placeholders."""
     col1, col2 = st.columns([2, 1])
 
+    with col1:
+        st.subheader("AI Disagreement")
+        st.markdown("**Key Counterarguments**")
+        counter_box = st.empty()
+
+        st.markdown("**Second-Order Impacts**")
+        impact_box = st.empty()
+
+        st.markdown("**De-risking Recommendations**")
+        rec_box = st.empty()
+
     with col2:
+        side_box = st.empty()
+        perf_box = st.empty()
+        notice_box = st.empty()
+
+    return {
+        "counterarguments": counter_box,
+        "impacts": impact_box,
+        "recommendations": rec_box,
+        "side": side_box,
+        "perf": perf_box,
+        "notice": notice_box,
+    }
+
+def bullets(items):
+    # One markdown element per list, not one per item: fewer deltas per rerun.
+    return "\n".join(f"- {item}" for item in items)
+
+def render_items(box, items):
+    box.markdown(bullets(items))
+
+def render_side(boxes, result):
+    with boxes["side"].container():
         st.subheader("Decision Confidence Score")
-        st.metric(label="Confidence (heuristic)", value=f"{conf}/100", help="Not a probability. Higher when inputs include specifics (numbers/timeframes/evidence), lower when vague or overconfident language is present.")
-        st.progress(conf / 100)
+        st.metric(label="Confidence (heuristic)", value=f"{result.confidence}/100", help="Not a probability. Higher when inputs include specifics (numbers/timeframes/evidence), lower when vague or overconfident language is present.")
+        st.progress(result.confidence / 100)
 
         st.subheader("Bias Signals Detected")
-        for b in biases:
-            st.markdown(f"- {b}")
+        st.markdown(bullets(result.biases))
 
         with st.expander("How the AI interpreted your decision (Parsed Intent)"):
-            st.json(intent)
-
-        if llm_error:
-            st.warning("OpenAI call failed; fell back to template mode.")
-            st.caption(llm_error[:300])
+            st.json(result.intent)
+
+def render_performance(boxes, trace):
+    if trace is None:
+        return
+    with boxes["perf"].container(), st.expander("Performance"):
+        st.markdown(f"**This request: {trace.total * 1000:.1f} ms**")
+        rows = trace.breakdown()
+        if rows:
+            st.markdown("| Stage | Start (ms) | Time (ms) |\n|---|---:|---:|\n" + "\n".join(
+                f"| {row['stage']} | {row['start_ms']:.1f} | {row['ms']:.2f} |" for row in rows))
+        else:
+            st.caption("Served from cache; no stages ran.")
+        st.markdown("**This process (recent requests)**")
+        st.markdown("| Stage | Count | p50 (ms) | p95 (ms) | p99 (ms) |\n|---|---:|---:|---:|---:|\n" + "\n".join(
+            f"| {stage} | {s['count']} | {s['p50']:.2f} | {s['p95']:.2f} | {s['p99']:.2f} |"
+            for stage, s in timing.stats().items()))
+
+def render_result(boxes, result):
+    render_side(boxes, result)
+    render_items(boxes["counterarguments"], result.counterarguments)
+    render_items(boxes["impacts"], result.impacts)
+    render_items(boxes["recommendations"], result.recommendations)
+
+    with boxes["notice"].container():
+        if result.llm_error:
+            st.warning("OpenAI call failed or timed out; showing template mode.")
+            st.caption(result.llm_error[:300])
+
+def render_partial(boxes, result):
+    # Template outputs go up at once; the LLM answer replaces them if it beats the deadline.
+    render_result(boxes, result)
+    boxes["notice"].caption("Waiting for OpenAI…")
+
+DONE_MESSAGE = "Done. This tool challenges decisions; it does not make them. Human judgment remains in control."
+
+# Template mode is pure, so results are cached across reruns and sessions.
+@st.cache_data(max_entries=512, show_spinner=False)
+def analyze_template(decision, context, level):
+    return analyze(decision, context, level=level, mode="template")
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def analyze_levels_template(decision, context):
+    return analyze_levels(decision, context, mode="template")
+
+def run_live(boxes, decision, context, level, mode, stream):
+    """Computes one level while rendering into boxes as results arrive."""
+    if mode == "template":
+        return analyze_template(decision, context, level)
+
+    if stream:
+        # Each section switches from template to LLM items on its first streamed item.
+        streamed = {}
+        for event, payload in analyze_stream(decision, context, level=level):
+            if event == "template":
+                render_partial(boxes, payload)
+            elif event == "done":
+                return payload
+            else:
+                streamed.setdefault(event, []).append(payload)
+                render_items(boxes[event], streamed[event])
+
+    return analyze(
+        decision,
+        context,
+        level=level,
+        mode=mode,
+        on_partial=lambda partial: render_partial(boxes, partial),
+    )
 
-    with col1:
-        st.subheader("AI Disagreement")
-        st.markdown("**Key Counterarguments**")
-        for c in counterargs:
-            st.markdown(f"- {c}")
+openai_mode = "openai" if use_openai and HAS_OPENAI else "template"
+
+# Results live in session state under a key built from the inputs, so reruns
+# (other widgets, resubmitting unchanged inputs) re-render without re-analyzing.
+# All-levels results cover every level, so the slider only picks which one to show.
+inputs_key = content_key(decision_text, context_text, None if all_levels else disagree_level, openai_mode, all_levels)
+analysis = st.session_state.get("analysis")
+rendered = False
+
+def reusable(analysis):
+    # An LLM answer that fell back to templates is retried on the next submit.
+    return (
+        analysis is not None
+        and analysis["key"] == inputs_key
+        and not any(result.llm_error for result in analysis["results"].values())
+    )
 
-        st.markdown("**Second-Order Impacts**")
-        for i in impacts:
-            st.markdown(f"- {i}")
+if submitted and all_levels:
+    if not reusable(analysis):
+        with st.spinner("Analyzing all five disagreement levels…"), timing.trace("submit") as trace:
+            if openai_mode == "template":
+                results = analyze_levels_template(decision_text, context_text)
+            else:
+                results = analyze_levels(decision_text, context_text, mode=openai_mode)
+        analysis = st.session_state["analysis"] = {"key": inputs_key, "all_levels": True, "results": results, "trace": trace}
+    st.session_state["view_level"] = disagree_level
+elif submitted and not reusable(analysis):
+    st.info(f"Disagreement mode: **{MODE_LABELS[disagree_level]}**")
+    boxes = results_layout()
+    with timing.trace("submit") as trace:
+        result = run_live(boxes, decision_text, context_text, disagree_level, openai_mode, stream_openai)
+        with timing.span("render"):
+            render_result(boxes, result)
+    render_performance(boxes, trace)
+    st.success(DONE_MESSAGE)
+    analysis = st.session_state["analysis"] = {"key": inputs_key, "all_levels": False, "results": {disagree_level: result}, "trace": trace}
+    rendered = True
+
+@st.fragment
+def stored_results_panel():
+    # A fragment: moving the level slider reruns only this panel, not the page.
+    analysis = st.session_state.get("analysis")
+    results = analysis["results"]
+    if analysis["all_levels"]:
+        # Every level was computed up front; the slider switches between them without a rerun of the pipeline.
+        view_level = st.select_slider(
+            "Disagreement level (all five precomputed)",
+            options=list(results),
+            format_func=lambda level: MODE_LABELS[level],
+            key="view_level",
+        )
+    else:
+        (view_level,) = results
+    st.info(f"Disagreement mode: **{MODE_LABELS[view_level]}**")
+    boxes = results_layout()
+    render_result(boxes, results[view_level])
+    render_performance(boxes, analysis.get("trace"))
+    st.success(DONE_MESSAGE)
 
-        st.markdown("**De-risking Recommendations**")
-        for r in recs:
-            st.markdown(f"- {r}")
+if analysis and not rendered:
+    stored_results_panel()
 
-    st.success("Done. This tool challenges decisions; it does not make them. Human judgment remains in control.")
+# -----------------------------
+# Batch mode
+# -----------------------------
+with st.expander("Batch mode: analyze a CSV or JSONL file of decisions"):
+    st.caption("One row per decision with `decision`, `context` and `level` (1–5) columns/keys. Results are written as each row finishes.")
+    batch_file = st.file_uploader("Decisions file", type=["csv", "jsonl", "ndjson"])
+    batch_openai = st.checkbox("Use OpenAI for batch rows", value=False, disabled=not HAS_OPENAI)
+    batch_format = st.radio("Output format", ["jsonl", "csv"], horizontal=True)
+    if batch_file is not None and st.button("Run batch"):
+        rows = read_rows(io.TextIOWrapper(batch_file, encoding="utf-8", newline=""), guess_format(batch_file.name))
+        progress = st.empty()
+        with tempfile.TemporaryFile("w+", encoding="utf-8", newline="") as out:
+            writer = ResultWriter(out, batch_format)
+            errors = 0
+            for record in run_batch(rows, mode="openai" if batch_openai and HAS_OPENAI else "template", workers=8):
+                writer.write(record)
+                errors += "error" in record
+                if writer.count % 25 == 0:
+                    progress.caption(f"{writer.count} rows analyzed…")
+            progress.caption(f"{writer.count} rows analyzed ({errors} with errors).")
+            out.seek(0)
+            st.download_button(
+                "Download results",
+                data=out.read(),
+                file_name=f"disagree_results.{batch_format}",
+                mime="text/csv" if batch_format == "csv" else "application/x-ndjson",
+            )
@@ -0,0 +1,44 @@
+import random
+import unittest
+import importlib.util
+
+from disagree import features
+from disagree.agents import confidence_score
+from disagree.text import KEYWORD_GROUPS
+
+def random_pairs(n, seed=7):
+    rng = random.Random(seed)
+    words = [k for group in KEYWORD_GROUPS.values() for k in group] + ["plan", "team", "3", "$500k", "12%", "on", "zero"]
+    def text():
+        return " ".join(rng.choice(words) for _ in range(rng.randrange(0, 12)))
+    return [(text(), text()) for _ in range(n)]
+
+class ConfidenceTest(unittest.TestCase):
+    PAIRS = [
+        ("A plan with zero", "risk"),          # risk denial split across the join
+        ("We decided this based", "on data"),  # evidence split across the join
+        ("Launch the new plan in 3 weeks", "Budget: $500k, due to churn"),
+        ("Ship it", ""),
+    ]
+
+    def test_phrases_split_across_the_join(self):
+        self.assertEqual(confidence_score("A plan with zero", "risk"), 45)
+        self.assertEqual(confidence_score("A plan with zero", "downside"), 60)
+        self.assertEqual(confidence_score("We decided this based", "on it"), 70)
+
+    def test_batch_projection_matches(self):
+        decisions, contexts = zip(*self.PAIRS)
+        expected = [confidence_score(d, c) for d, c in self.PAIRS]
+        self.assertEqual(features.confidence(features.extract(list(decisions), list(contexts))), expected)
+
+@unittest.skipUnless(importlib.util.find_spec("numpy"), "needs numpy")
+class VectorizedTest(unittest.TestCase):
+    def test_matches_confidence_score(self):
+        from disagree import vectorized
+
+        pairs = ConfidenceTest.PAIRS + random_pairs(500)
+        decisions, contexts = zip(*pairs)
+        self.assertEqual(vectorized.confidence_scores(list(decisions), list(contexts)).tolist(), [confidence_score(d, c) for d, c in pairs])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import io
+import csv
+import unittest
+
+from disagree.batch import ResultWriter, guess_format, read_rows, run_batch
+
+CSV = """decision,context,level
+We will launch the new product ASAP,Budget $500k,4
+Hire two engineers,,
+Ship it,,nine
+"""
+
+class ReadRowsTest(unittest.TestCase):
+    def test_csv(self):
+        rows = list(read_rows(io.StringIO(CSV), "csv"))
+        self.assertEqual(rows[0], {"decision": "We will launch the new product ASAP", "context": "Budget $500k", "level": 4, "mode": None})
+        self.assertEqual(rows[1]["level"], 3)
+        self.assertTrue(rows[2]["error"].startswith("unreadable row"))
+
+    def test_jsonl_skips_blank_lines_and_keeps_bad_ones(self):
+        text = '{"decision": "Ship it", "mode": "openai"}\n\n[1]\n{"decision": 3}\nnot json\n'
+        rows = list(read_rows(io.StringIO(text)))
+        self.assertEqual(rows[0]["mode"], "openai")
+        self.assertEqual(len(rows), 4)
+        self.assertTrue(all("error" in row for row in rows[1:]))
+
+    def test_guess_format(self):
+        self.assertEqual([guess_format(n) for n in ("a.CSV", "a.ndjson", "-", None)], ["csv", "jsonl", "jsonl", "jsonl"])
+
+class RunBatchTest(unittest.TestCase):
+    def test_results_keep_input_order(self):
+        rows = [{"decision": f"Decision {i} ASAP", "context": "", "level": 1 + i % 5} for i in range(50)]
+        rows[7] = {"error": "unreadable row: x"}
+        records = list(run_batch(rows, workers=4, max_pending=3))
+        self.assertEqual([r["row"] for r in records], list(range(50)))
+        self.assertEqual(records[7], {"row": 7, "error": "unreadable row: x"})
+        self.assertEqual(records[8]["intent"]["decision"], "Decision 8 ASAP")
+
+    def test_csv_writer_flattens_lists(self):
+        out = io.StringIO()
+        writer = ResultWriter(out, "csv")
+        for record in run_batch(read_rows(io.StringIO(CSV), "csv")):
+            writer.write(record)
+        rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+        self.assertEqual(writer.count, 3)
+        self.assertEqual(rows[0]["decision"], "We will launch the new product ASAP")
+        self.assertIn("\n", rows[0]["counterarguments"])
+        self.assertTrue(rows[2]["error"])
+
+if __name__ == "__main__":
+    unittest.main()
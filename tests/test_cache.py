@@ -0,0 +1,95 @@
+import os
+import json
+import tempfile
+import unittest
+
+from disagree.cache import LRUCache, SQLiteCache, TieredCache, content_key
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        self.now += 1
+        return self.now
+
+class LRUCacheTest(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual((cache.get("a"), cache.get("b"), cache.get("c")), (1, None, 3))
+
+    def test_ttl(self):
+        clock = FakeClock()
+        cache = LRUCache(ttl=1.5, clock=clock)
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("a"))
+
+    def test_content_key_is_stable(self):
+        self.assertEqual(content_key("a", 1, {"b": 2, "c": 3}), content_key("a", 1, {"c": 3, "b": 2}))
+        self.assertNotEqual(content_key("a", 1), content_key("a", 2))
+
+class SQLiteCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "cache.sqlite3")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def stored_bytes(self, cache):
+        return cache._conn().execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def test_round_trip(self):
+        cache = SQLiteCache(self.path)
+        cache.set("k", {"impacts": ["x"]})
+        self.assertEqual(cache.get("k"), {"impacts": ["x"]})
+        self.assertIsNone(cache.get("missing"))
+
+    def test_evicts_least_recently_accessed_within_max_bytes(self):
+        value = {"counterarguments": ["x" * 80]}
+        size = len(json.dumps(value))
+        cache = SQLiteCache(self.path, max_bytes=size * 5, clock=FakeClock())
+        for i in range(5):
+            cache.set(f"k{i}", value)
+        cache.get("k0")  # k1 is now the least recently accessed
+        cache.set("k5", value)
+        self.assertIsNone(cache.get("k1"))
+        for key in ("k0", "k2", "k3", "k4", "k5"):
+            self.assertEqual(cache.get(key), value, key)
+        for i in range(6, 50):
+            cache.set(f"k{i}", value)
+            self.assertLessEqual(self.stored_bytes(cache), cache.max_bytes)
+        self.assertEqual(cache.get("k49"), value)
+        self.assertEqual(cache._total, self.stored_bytes(cache))
+
+    def test_replacing_a_key_does_not_double_count(self):
+        value = {"impacts": ["y" * 50]}
+        cache = SQLiteCache(self.path, max_bytes=len(json.dumps(value)) * 2, clock=FakeClock())
+        cache.set("a", value)
+        for _ in range(5):
+            cache.set("b", value)
+        self.assertEqual(cache.get("a"), value)
+
+    def test_ttl_expires_rows(self):
+        clock = FakeClock()
+        cache = SQLiteCache(self.path, ttl=2.5, clock=clock)
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        clock.now += 10
+        self.assertIsNone(cache.get("a"))
+
+    def test_tiered_cache_promotes_and_warms(self):
+        disk = SQLiteCache(self.path)
+        disk.set("hot", {"x": 1})
+        disk.get("hot")
+        tiered = TieredCache(LRUCache(), SQLiteCache(self.path))
+        self.assertEqual(tiered.warm(10), 1)
+        self.assertEqual(tiered.memory.get("hot"), {"x": 1})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import os
+import asyncio
+import tempfile
+import unittest
+from types import SimpleNamespace as NS
+
+from disagree.cassette import Cassette, CassetteMiss, RecordingClient, ReplayClient, ReplayedError
+
+ANSWER = '{"counterarguments": ["c"], "impacts": ["i"], "recommendations": ["r"]}'
+REQUEST = {"model": "m", "messages": [{"role": "user", "content": "Ship it?"}], "temperature": 0.5}
+
+class Usage(NS):
+    def model_dump(self):
+        return dict(vars(self))
+
+def chunks():
+    for i in range(0, len(ANSWER), 10):
+        yield NS(id="x", model="m", choices=[NS(delta=NS(content=ANSWER[i:i + 10]), finish_reason=None)], usage=None)
+    yield NS(id="x", model="m", choices=[], usage=Usage(prompt_tokens=3, completion_tokens=4))
+
+class Stream:
+    def __init__(self):
+        self.closed = False
+
+    def __iter__(self):
+        return chunks()
+
+    def close(self):
+        self.closed = True
+
+class AsyncStream(Stream):
+    async def _aiter(self):
+        for chunk in chunks():
+            yield chunk
+
+    def __aiter__(self):
+        return self._aiter()
+
+    async def close(self):
+        self.closed = True
+
+def answer(**kwargs):
+    if "boom" in kwargs["messages"][0]["content"]:
+        raise RuntimeError("Error code: 500")
+    if kwargs.get("stream"):
+        return Stream()
+    message = NS(content=ANSWER)
+    return NS(id="x", model="m", usage=Usage(prompt_tokens=3, completion_tokens=4), choices=[NS(message=message, finish_reason="stop")])
+
+async def answer_async(**kwargs):
+    if kwargs.get("stream"):
+        answer(**kwargs)  # same errors
+        return AsyncStream()
+    return answer(**kwargs)
+
+def text_of(stream):
+    return "".join(c.choices[0].delta.content or "" for c in stream if c.choices)
+
+class CassetteTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "calls.jsonl.gz")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def recorder(self, async_=False):
+        create = answer_async if async_ else answer
+        return RecordingClient(NS(chat=NS(completions=NS(create=create))), Cassette(self.path), async_)
+
+    def replayer(self, async_=False):
+        return ReplayClient(Cassette(self.path, timing="none").load(), async_)
+
+    def test_round_trip(self):
+        rec = self.recorder()
+        self.assertEqual(rec.chat.completions.create(**REQUEST).choices[0].message.content, ANSWER)
+        self.assertEqual(text_of(rec.chat.completions.create(**REQUEST, stream=True)), ANSWER)
+        with self.assertRaises(RuntimeError):
+            rec.chat.completions.create(**{**REQUEST, "messages": [{"role": "user", "content": "boom"}]})
+
+        play = self.replayer()
+        resp = play.chat.completions.create(**REQUEST, timeout=3)  # timeout is not part of the key
+        self.assertEqual(resp.choices[0].message.content, ANSWER)
+        self.assertEqual(resp.usage.completion_tokens, 4)
+        replayed = list(play.chat.completions.create(**REQUEST, stream=True))
+        self.assertEqual(text_of(replayed), ANSWER)
+        self.assertEqual(replayed[-1].choices, [])  # the usage chunk comes last
+        self.assertEqual(replayed[-1].usage.prompt_tokens, 3)
+        with self.assertRaises(ReplayedError):
+            play.chat.completions.create(**{**REQUEST, "messages": [{"role": "user", "content": "boom"}]})
+        with self.assertRaises(CassetteMiss):
+            play.chat.completions.create(**{**REQUEST, "temperature": 0.9})
+
+    def test_async_round_trip(self):
+        async def record():
+            stream = await self.recorder(async_=True).chat.completions.create(**REQUEST, stream=True)
+            return [chunk async for chunk in stream]
+
+        async def replay():
+            stream = await self.replayer(async_=True).chat.completions.create(**REQUEST, stream=True)
+            return [chunk async for chunk in stream]
+
+        self.assertEqual(text_of(asyncio.run(record())), ANSWER)
+        self.assertEqual(text_of(asyncio.run(replay())), ANSWER)
+
+    def test_file_is_complete_after_each_call(self):
+        import gzip, json
+
+        rec = self.recorder()
+        rec.chat.completions.create(**REQUEST)
+        self.assertEqual(len(self.replayer().cassette._records), 1)  # readable with nothing closed
+        rec.chat.completions.create(**{**REQUEST, "temperature": 0.9})
+        member = gzip.compress(json.dumps({"key": "cut", "content": "x"}).encode() + b"\n")
+        with open(self.path, "ab") as fp:
+            fp.write(member[: len(member) // 2])  # the process died mid-write
+        play = self.replayer()
+        self.assertEqual(len(play.cassette._records), 2)
+        self.assertEqual(play.chat.completions.create(**REQUEST).choices[0].message.content, ANSWER)
+
+    def test_abandoned_stream_is_not_recorded(self):
+        rec = self.recorder()
+        stream = rec.chat.completions.create(**REQUEST, stream=True)
+        for _ in zip(range(2), stream):
+            pass
+        stream.close()  # e.g. no item before the deadline
+        self.assertFalse(os.path.exists(self.path))
+
+        stream = rec.chat.completions.create(**REQUEST, stream=True)
+        self.assertEqual(text_of(stream), ANSWER)
+        stream.close()  # closing after the end keeps the record
+        self.assertEqual(text_of(self.replayer().chat.completions.create(**REQUEST, stream=True)), ANSWER)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import io
+import json
+import unittest
+import contextlib
+
+from disagree import cli
+from disagree.batch import read_rows, run_batch
+
+ROWS = [
+    {"decision": "We will launch the new product ASAP", "level": 4},
+    {"decision": "Hire two engineers", "context": "Budget $500k", "level": "2"},
+    {"decision": "Ship it", "level": 9},
+    {"decision": 3},
+    {"decision": "Ship it", "mode": "gpt"},
+    [1, 2],
+]
+
+def jsonl(rows):
+    return "".join(json.dumps(row) + "\n" for row in rows) + "\n"
+
+class RunJsonlTest(unittest.TestCase):
+    def run_cli(self, text, level=3, mode="template"):
+        out = io.StringIO()
+        cli.run_jsonl(io.StringIO(text), out, level, mode)
+        return [json.loads(line) for line in out.getvalue().splitlines()]
+
+    def test_rows_read_like_batch(self):
+        via_cli = self.run_cli(jsonl(ROWS))
+        via_batch = [{k: v for k, v in r.items() if k != "row"} for r in run_batch(read_rows(io.StringIO(jsonl(ROWS))))]
+        self.assertEqual(via_cli, via_batch)
+        self.assertEqual([r["level"] for r in via_cli[:2]], [4, 2])
+        self.assertTrue(all("error" in r for r in via_cli[2:]))
+
+    def test_defaults_apply_to_rows_without_their_own(self):
+        results = self.run_cli(jsonl([{"decision": "Ship it"}, {"decision": "Ship it", "level": 1}]), level=5)
+        self.assertEqual([r["level"] for r in results], [5, 1])
+        self.assertEqual(self.run_cli("not json\n")[0]["error"].split(":")[0], "unreadable row")
+
+class MainTest(unittest.TestCase):
+    def main(self, *argv):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            code = cli.main(list(argv))
+        return code, out.getvalue()
+
+    def test_json_output(self):
+        code, out = self.main("--json", "-l", "2", "Ship it ASAP")
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads(out)["level"], 2)
+
+    def test_text_output_and_fail_under(self):
+        code, out = self.main("We will definitely launch ASAP", "--fail-under", "101")
+        self.assertEqual(code, 1)
+        self.assertIn("Key counterarguments:", out)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import asyncio
+import unittest
+
+from disagree import gateway, llm
+from disagree.engine import analyze, analyze_async, template_outputs
+from disagree.gateway import deadline_message, split_outputs
+
+DECISION = "We will launch the new product ASAP"
+ANSWER = {"counterarguments": ["c"], "impacts": ["i"], "recommendations": ["r"]}
+
+def fake_call(answer=ANSWER, delay=0.0, error=None):
+    async def call(intent, level):
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return answer
+    return call
+
+class SplitOutputsTest(unittest.TestCase):
+    def test_split(self):
+        self.assertEqual(split_outputs(ANSWER), (["c"], ["i"], ["r"]))
+        self.assertEqual(split_outputs({"impacts": ["i"]}), ([], ["i"], []))
+
+    def test_rejects_bad_answers(self):
+        for out in ([], "text", None, {"impacts": "not a list"}):
+            with self.assertRaises(ValueError, msg=repr(out)):
+                split_outputs(out)
+
+class RaceTest(unittest.TestCase):
+    def setUp(self):
+        self.saved = llm.HAS_OPENAI, llm.openai_one_call_async
+        llm.HAS_OPENAI = True
+
+    def tearDown(self):
+        llm.HAS_OPENAI, llm.openai_one_call_async = self.saved
+
+    def run_both(self, **fake):
+        # The async path (server) and the blocking path (Streamlit, CLI) share one contract.
+        llm.openai_one_call_async = fake_call(**fake)
+        blocking = analyze(DECISION, "", 3, "openai", deadline=0.2)
+        llm.openai_one_call_async = fake_call(**fake)
+        async_ = asyncio.run(analyze_async(DECISION, "", 3, "openai", deadline=0.2))
+        return blocking, async_
+
+    def test_llm_answer_wins(self):
+        for result in self.run_both():
+            self.assertIsNone(result.llm_error)
+            self.assertEqual(result.counterarguments, ["c"])
+
+    def test_deadline_falls_back_to_templates(self):
+        template = template_outputs(analyze(DECISION).intent, 3)
+        for result in self.run_both(delay=5):
+            self.assertEqual(result.llm_error, deadline_message(0.2))
+            self.assertEqual((result.counterarguments, result.impacts, result.recommendations), template)
+
+    def test_errors_and_non_object_answers_fall_back(self):
+        for fake in ({"error": RuntimeError("Error code: 500")}, {"answer": [1, 2]}, {"answer": {"impacts": "x"}}):
+            for result in self.run_both(**fake):
+                self.assertTrue(result.llm_error, fake)
+                self.assertEqual(result.mode, "openai")
+                self.assertTrue(result.counterarguments)
+
+    def test_on_template_runs_before_the_answer(self):
+        seen = []
+        llm.openai_one_call_async = fake_call(delay=0.05)
+        outputs, error = gateway.race_blocking(analyze(DECISION).intent, 3, deadline=1, on_template=lambda *t: seen.append(t))
+        self.assertIsNone(error)
+        self.assertEqual(len(seen), 1)
+        self.assertEqual(outputs, (["c"], ["i"], ["r"]))
+
+    def test_no_key(self):
+        llm.HAS_OPENAI = False
+        self.assertEqual(analyze(DECISION, mode="openai").llm_error, "OPENAI_API_KEY is not set")
+
+if __name__ == "__main__":
+    unittest.main()
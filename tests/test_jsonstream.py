@@ -0,0 +1,75 @@
+import json
+import unittest
+
+from disagree.jsonstream import ItemStream, parse_stream
+
+SECTIONS = ("counterarguments", "impacts", "recommendations")
+
+ANSWER = {
+    "counterarguments": ["Too fast, {really}", "Budget is \"tight\""],
+    "impacts": [{"what": "churn", "odds": 0.2}, []],
+    "recommendations": ["Pilot first", "Add a kill switch, then review"],
+}
+TEXT = json.dumps(ANSWER)
+ITEMS = [(section, item) for section in SECTIONS for item in ANSWER[section]]
+
+def chunked(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+def feed_all(text, size):
+    parser = ItemStream(SECTIONS)
+    events = []
+    for chunk in chunked(text, size):
+        events.extend(parser.feed(chunk))
+    return parser, events
+
+class ItemStreamTest(unittest.TestCase):
+    def test_every_chunk_size(self):
+        for size in range(1, len(TEXT) + 1):
+            parser, events = feed_all(TEXT, size)
+            self.assertEqual(events, ITEMS, size)
+            self.assertEqual(parser.close(), ANSWER, size)
+
+    def test_prose_with_braces_before_the_object(self):
+        text = "Sure! Here is {the answer} as {json}: " + TEXT + " Hope that helps {ok}."
+        for size in (1, 2, 7, len(text)):
+            parser, events = feed_all(text, size)
+            self.assertEqual(events, ITEMS, size)
+            self.assertEqual(parser.close(), ANSWER, size)
+
+    def test_truncated_answer(self):
+        cut = TEXT.index("Add a kill switch")
+        parser, events = feed_all(TEXT[:cut], 3)
+        self.assertEqual(events, ITEMS[:-1])  # items completed before the cut still arrive
+        with self.assertRaises(ValueError):
+            parser.close()
+
+    def test_parse_stream_returns_the_object(self):
+        stream = parse_stream(chunked(TEXT, 5), SECTIONS)
+        events = []
+        try:
+            while True:
+                events.append(next(stream))
+        except StopIteration as stop:
+            self.assertEqual(stop.value, ANSWER)
+        self.assertEqual(events, ITEMS)
+
+class NonObjectTest(unittest.TestCase):
+    def test_top_level_list(self):
+        parser = ItemStream(SECTIONS)
+        parser.feed('[{"counterarguments": ["a"]}]')
+        self.assertEqual(parser.close(), {"counterarguments": ["a"]})  # the object inside is salvaged
+        parser = ItemStream(SECTIONS)
+        parser.feed("[1, 2, 3]")
+        with self.assertRaises(ValueError):
+            parser.close()
+
+    def test_no_object(self):
+        for raw in ('"text"', "3", "null", "no JSON here", "{ not json"):
+            parser = ItemStream(SECTIONS)
+            parser.feed(raw)
+            with self.assertRaises(ValueError, msg=raw):
+                parser.close()
+
+if __name__ == "__main__":
+    unittest.main()
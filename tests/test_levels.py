@@ -0,0 +1,49 @@
+import asyncio
+import unittest
+
+from disagree import llm
+from disagree.engine import analyze, analyze_levels
+from disagree.gateway import deadline_message
+
+DECISION = "We will launch the new product ASAP"
+CONTEXT = "Budget $500k, team of 4"
+
+def fake_levels(levels, delay=0.0):
+    async def call(intent):
+        await asyncio.sleep(delay)
+        return {level: {"counterarguments": [f"c{level}"], "impacts": [], "recommendations": []} for level in levels}
+    return call
+
+class AnalyzeLevelsTest(unittest.TestCase):
+    def setUp(self):
+        self.saved = llm.HAS_OPENAI, llm.openai_all_levels_async
+        llm.HAS_OPENAI = True
+
+    def tearDown(self):
+        llm.HAS_OPENAI, llm.openai_all_levels_async = self.saved
+
+    def test_template_levels_match_single_analyses(self):
+        results = analyze_levels(DECISION, CONTEXT)
+        self.assertEqual(sorted(results), [1, 2, 3, 4, 5])
+        for level, result in results.items():
+            self.assertEqual(result, analyze(DECISION, CONTEXT, level=level), level)
+
+    def test_missing_levels_fall_back_to_templates(self):
+        llm.openai_all_levels_async = fake_levels((1, 2, 3))
+        results = analyze_levels(DECISION, CONTEXT, mode="openai")
+        self.assertEqual(results[2].counterarguments, ["c2"])
+        self.assertIsNone(results[2].llm_error)
+        self.assertEqual(results[5].counterarguments, analyze(DECISION, CONTEXT, level=5).counterarguments)
+        self.assertEqual(results[5].llm_error, "OpenAI answer had no level 5")
+
+    def test_deadline(self):
+        llm.openai_all_levels_async = fake_levels((1, 2, 3, 4, 5), delay=5)
+        results = analyze_levels(DECISION, mode="openai", deadline=0.2)
+        self.assertEqual({r.llm_error for r in results.values()}, {deadline_message(0.2)})
+
+    def test_no_key(self):
+        llm.HAS_OPENAI = False
+        self.assertEqual(analyze_levels(DECISION, mode="openai")[1].llm_error, "OPENAI_API_KEY is not set")
+
+if __name__ == "__main__":
+    unittest.main()
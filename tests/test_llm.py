@@ -0,0 +1,65 @@
+import unittest
+from types import SimpleNamespace as NS
+
+from disagree import llm
+from disagree.cache import LRUCache
+
+INTENT = {"decision": "Launch now", "context": "", "signals": {}}
+COMPLETE = '{"counterarguments": ["c"], "impacts": [], "recommendations": ["r"]}'
+
+class FakeClient:
+    """Answers chat.completions.create with the given texts, in order."""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.calls = 0
+        self.chat = NS(completions=NS(create=self.create))
+
+    def create(self, **kwargs):
+        self.calls += 1
+        return NS(choices=[NS(message=NS(content=self.answers.pop(0)))], usage=None)
+
+class ParseResponseTest(unittest.TestCase):
+    def test_clean_json_and_prose(self):
+        self.assertEqual(llm.parse_response(COMPLETE)["recommendations"], ["r"])
+        self.assertEqual(llm.parse_response("Sure: " + COMPLETE + " Done."), llm.parse_response(COMPLETE))
+
+    def test_rejects_non_objects(self):
+        for raw in ("[1, 2]", '"text"', "3", "null", "", "no JSON here"):
+            with self.assertRaises(ValueError, msg=raw):
+                llm.parse_response(raw)
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.saved = llm.RESPONSE_CACHE, llm._client
+        llm.RESPONSE_CACHE = LRUCache()
+
+    def tearDown(self):
+        llm.RESPONSE_CACHE, llm._client = self.saved
+
+    def test_complete_answers_are_cached(self):
+        llm._client = client = FakeClient(COMPLETE)
+        first = llm.openai_one_call(INTENT, 3)
+        self.assertEqual(llm.openai_one_call(INTENT, 3), first)
+        self.assertEqual(client.calls, 1)
+
+    def test_partial_answers_are_not_cached(self):
+        llm._client = client = FakeClient('{"counterarguments": ["c"]}', COMPLETE)
+        self.assertEqual(llm.openai_one_call(INTENT, 3), {"counterarguments": ["c"]})
+        self.assertEqual(len(llm.RESPONSE_CACHE), 0)
+        self.assertEqual(llm.openai_one_call(INTENT, 3)["recommendations"], ["r"])
+        self.assertEqual(client.calls, 2)
+
+    def test_non_object_answer_raises_and_is_not_cached(self):
+        llm._client = FakeClient("[1, 2]")
+        with self.assertRaises(ValueError):
+            llm.openai_one_call(INTENT, 3)
+        self.assertEqual(len(llm.RESPONSE_CACHE), 0)
+
+    def test_cached_answers_are_copies(self):
+        llm._client = FakeClient(COMPLETE)
+        llm.openai_one_call(INTENT, 3)["counterarguments"].append("mutated")
+        self.assertEqual(llm.openai_one_call(INTENT, 3)["counterarguments"], ["c"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import math
+import random
+import unittest
+
+from disagree.metrics import Histogram
+
+class HistogramTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.hist = Histogram("test_histogram_seconds", "Histogram under test.")
+
+    def assert_in_bucket(self, value):
+        bounds = self.hist.bounds
+        i = self.hist.index(value)
+        self.assertLessEqual(value, bounds[i], value)
+        if i:
+            self.assertGreater(value, bounds[i - 1], value)
+
+    def test_index_matches_bounds(self):
+        rng = random.Random(3)
+        for _ in range(20000):
+            self.assert_in_bucket(10 ** rng.uniform(-7, 3))
+
+    def test_exact_bounds_are_inclusive(self):
+        for bound in self.hist.bounds[:-1]:
+            self.assert_in_bucket(bound)
+
+    def test_edges(self):
+        self.assertEqual(self.hist.index(0), 0)
+        self.assertEqual(self.hist.index(1e-9), 0)
+        self.assertEqual(self.hist.index(1e6), len(self.hist.bounds) - 1)
+        self.assertEqual(self.hist.bounds[-1], math.inf)
+        self.assertGreater(self.hist.bounds[-2], 60)
+
+    def test_relative_error(self):
+        bounds = self.hist.bounds[:-1]
+        for low, high in zip(bounds, bounds[1:]):
+            self.assertLessEqual(high / low, 1.25 + 1e-9)
+
+    def test_quantile(self):
+        hist = Histogram("test_quantile_seconds", "Histogram under test.", ("kind",))
+        self.assertIsNone(hist.quantile(0.5, "x"))
+        for ms in range(1, 101):
+            hist.observe(ms / 1000, "x")
+        p99 = hist.quantile(0.99, "x")
+        self.assertGreaterEqual(p99, 0.099)
+        self.assertLessEqual(p99, 0.099 * 1.25)
+
+if __name__ == "__main__":
+    unittest.main()
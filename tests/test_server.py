@@ -0,0 +1,145 @@
+import json
+import asyncio
+import unittest
+
+from disagree import llm, server
+
+DECISION = "We will launch the new product ASAP"
+
+class Client:
+    """Drives server.app in-process; each request's sent messages are kept in order."""
+
+    def __init__(self, method, path, body=None, query=b""):
+        raw = b"" if body is None else json.dumps(body).encode()
+        self.scope = {"type": "http", "method": method, "path": path, "query_string": query}
+        self.incoming = [{"type": "http.request", "body": raw, "more_body": False}]
+        self.disconnect = asyncio.Event()
+        self.sent = []
+
+    async def receive(self):
+        if self.incoming:
+            return self.incoming.pop(0)
+        await self.disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message):
+        self.sent.append(message)
+
+    async def run(self):
+        await server.app(self.scope, self.receive, self.send)
+        return self
+
+    @property
+    def status(self):
+        return self.sent[0]["status"]
+
+    @property
+    def body(self):
+        return b"".join(m.get("body", b"") for m in self.sent[1:])
+
+    def json(self):
+        return json.loads(self.body)
+
+    def events(self):
+        out = []
+        for block in self.body.decode().split("\n\n"):
+            if block:
+                event, data = block.split("\n")
+                out.append((event[len("event: "):], json.loads(data[len("data: "):])))
+        return out
+
+def request(*args, **kwargs):
+    return asyncio.run(Client(*args, **kwargs).run())
+
+class EndpointTest(unittest.TestCase):
+    def test_analyze(self):
+        client = request("POST", "/analyze", {"decision": DECISION, "level": 4})
+        self.assertEqual(client.status, 200)
+        result = client.json()
+        self.assertEqual((result["level"], result["mode"]), (4, "template"))
+        self.assertTrue(result["counterarguments"])
+
+    def test_batch_reports_bad_items_in_place(self):
+        items = [{"decision": DECISION}, {"decision": ""}, "not an object"]
+        results = request("POST", "/analyze/batch", {"items": items}).json()["results"]
+        self.assertIn("confidence", results[0])
+        self.assertEqual(results[1], {"error": "'decision' must be a non-empty string"})
+        self.assertEqual(results[2], {"error": "each request must be a JSON object"})
+        self.assertEqual(len(request("POST", "/analyze/batch", items).json()["results"]), 3)  # bare list
+
+    def test_client_errors(self):
+        for body in ({"decision": DECISION, "level": 6}, {"decision": DECISION, "level": True}, {"decision": DECISION, "mode": "gpt"}, [1]):
+            self.assertEqual(request("POST", "/analyze", body).status, 400, body)
+        client = Client("POST", "/analyze")
+        client.incoming = [{"type": "http.request", "body": b"{not json", "more_body": False}]
+        self.assertEqual(asyncio.run(client.run()).json(), {"error": "request body must be JSON"})
+        self.assertEqual(request("GET", "/analyze").status, 405)
+        self.assertEqual(request("GET", "/nope").status, 404)
+
+    def test_health_and_metrics(self):
+        self.assertEqual(request("GET", "/healthz").json(), {"status": "ok"})
+        request("POST", "/analyze", {"decision": DECISION})
+        client = request("GET", "/metrics")
+        self.assertEqual(client.status, 200)
+        self.assertIn(b"disagree_", client.body)
+
+class StreamTest(unittest.TestCase):
+    def setUp(self):
+        self.saved = llm.HAS_OPENAI, llm.openai_one_call_stream_async, server._llm_slots
+        llm.HAS_OPENAI = True
+        llm.openai_one_call_stream_async = self.fake_stream
+        server._llm_slots = None
+        self.calls = 0
+
+    def tearDown(self):
+        llm.HAS_OPENAI, llm.openai_one_call_stream_async, server._llm_slots = self.saved
+
+    async def fake_stream(self, intent, level):
+        self.calls += 1
+        for section in ("counterarguments", "impacts", "recommendations"):
+            await asyncio.sleep(0)
+            yield section, f"llm {section}"
+
+    def test_events_in_order(self):
+        events = request("POST", "/analyze/stream", {"decision": DECISION}).events()
+        self.assertEqual([e for e, _ in events], ["template", "counterarguments", "impacts", "recommendations", "done"])
+        self.assertEqual(events[-1][1]["counterarguments"], ["llm counterarguments"])
+        self.assertEqual(events[-1][1]["mode"], "openai")
+
+    def test_get_with_query_params(self):
+        events = request("GET", "/analyze/stream", query=b"decision=Launch+now&level=2").events()
+        self.assertEqual(events[0][1]["level"], 2)
+        self.assertEqual(events[-1][0], "done")
+
+    def test_template_mode_makes_no_llm_call(self):
+        events = request("POST", "/analyze/stream", {"decision": DECISION, "mode": "template"}).events()
+        self.assertEqual([e for e, _ in events], ["template", "done"])
+        self.assertEqual(events[-1][1]["mode"], "template")
+        self.assertEqual(self.calls, 0)
+
+    def test_template_is_sent_before_waiting_for_a_slot(self):
+        async def run():
+            server._llm_slots = slots = asyncio.Semaphore(1)
+            await slots.acquire()  # every LLM slot is busy
+            client = Client("POST", "/analyze/stream", {"decision": DECISION})
+            task = asyncio.ensure_future(client.run())
+            for _ in range(200):
+                if len(client.sent) > 1:
+                    break
+                await asyncio.sleep(0.01)
+            early = client.events()
+            slots.release()
+            await task
+            return early, client.events()
+
+        early, events = asyncio.run(run())
+        self.assertEqual([e for e, _ in early], ["template"])
+        self.assertEqual(events[-1][0], "done")
+
+    def test_bad_input_is_rejected_before_the_stream(self):
+        client = request("POST", "/analyze/stream", {"decision": ""})
+        self.assertEqual(client.status, 400)
+        self.assertEqual(request("POST", "/analyze/stream", {"decision": DECISION, "mode": "gpt"}).status, 400)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import os
+import sys
+import time
+import asyncio
+import unittest
+import importlib.util
+from types import SimpleNamespace as NS
+
+from disagree import llm
+from disagree.cache import LRUCache
+from disagree.engine import analyze_stream, analyze_stream_async
+from disagree.gateway import deadline_message
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+
+DECISION = "We will launch the new product ASAP"
+ANSWER = '{"counterarguments": ["a", "b"], "impacts": ["i"], "recommendations": ["r"]}'
+
+def chunk(text):
+    return NS(choices=[NS(delta=NS(content=text))], usage=None)
+
+class FakeStream:
+    def __init__(self, gap):
+        self.gap = gap
+        self.closed = False
+
+    def __iter__(self):
+        for ch in ANSWER:
+            time.sleep(self.gap)
+            yield chunk(ch)
+
+    def close(self):
+        self.closed = True
+
+class FakeClient:
+    """Streams ANSWER one character every `gap` seconds; remembers with_options()."""
+
+    def __init__(self, gap=0.0):
+        self.gap = gap
+        self.options = None
+        self.streams = []
+        self.chat = NS(completions=NS(create=self.create))
+
+    def with_options(self, **options):
+        self.options = options
+        return self
+
+    def create(self, **kwargs):
+        self.streams.append(FakeStream(self.gap))
+        return self.streams[-1]
+
+class StreamDeadlineTest(unittest.TestCase):
+    def setUp(self):
+        self.saved = llm.HAS_OPENAI, llm._client, llm.RESPONSE_CACHE
+        llm.HAS_OPENAI = True
+        llm.RESPONSE_CACHE = LRUCache(maxsize=0)
+
+    def tearDown(self):
+        llm.HAS_OPENAI, llm._client, llm.RESPONSE_CACHE = self.saved
+
+    def test_items_stream_within_the_deadline(self):
+        llm._client = client = FakeClient()
+        events = list(analyze_stream(DECISION, deadline=1))
+        self.assertEqual([e for e, _ in events], ["template", "counterarguments", "counterarguments", "impacts", "recommendations", "done"])
+        self.assertIsNone(events[-1][1].llm_error)
+        self.assertEqual(client.options, {"max_retries": 0, "timeout": 1})
+
+    def test_no_item_by_the_deadline_falls_back(self):
+        llm._client = client = FakeClient(gap=0.05)
+        start = time.perf_counter()
+        events = list(analyze_stream(DECISION, deadline=0.3))
+        self.assertLess(time.perf_counter() - start, 0.6)
+        self.assertEqual([e for e, _ in events], ["template", "done"])
+        self.assertEqual(events[-1][1].llm_error, deadline_message(0.3))
+        self.assertEqual(events[-1][1].counterarguments, events[0][1].counterarguments)
+        self.assertTrue(client.streams[0].closed)
+
+    def test_client_timeout_maps_to_the_deadline(self):
+        class TimingOut(FakeClient):
+            def create(self, **kwargs):
+                raise TimeoutError("Request timed out.")
+
+        llm._client = TimingOut()
+        events = list(analyze_stream(DECISION, deadline=0.3))
+        self.assertEqual(events[-1][1].llm_error, deadline_message(0.3))
+
+    def test_async_deadline(self):
+        async def slow_stream(intent, level):
+            await asyncio.sleep(5)
+            yield "counterarguments", "late"
+
+        async def run():
+            return [event async for event in analyze_stream_async(DECISION, deadline=0.2)]
+
+        saved = llm.openai_one_call_stream_async
+        llm.openai_one_call_stream_async = slow_stream
+        try:
+            events = asyncio.run(run())
+        finally:
+            llm.openai_one_call_stream_async = saved
+        self.assertEqual([e for e, _ in events], ["template", "done"])
+        self.assertEqual(events[-1][1].llm_error, deadline_message(0.2))
+
+@unittest.skipUnless(importlib.util.find_spec("openai") and importlib.util.find_spec("httpx"), "needs the openai package")
+class FakeServerDeadlineTest(unittest.TestCase):
+    """The real client against benchmarks/fake_openai.py: a late first byte ends on the deadline."""
+
+    def setUp(self):
+        import fake_openai
+
+        self.server = fake_openai.start(fake_openai.Behavior(latency="fixed:3", token_rate=0))
+        self.saved = llm.HAS_OPENAI, llm.OPENAI_API_KEY, llm._client, llm.RESPONSE_CACHE, os.environ.get("OPENAI_BASE_URL")
+        os.environ["OPENAI_BASE_URL"] = self.server.base_url
+        llm.HAS_OPENAI, llm.OPENAI_API_KEY, llm._client = True, "fake-key", None
+        llm.RESPONSE_CACHE = LRUCache(maxsize=0)
+
+    def tearDown(self):
+        self.server.shutdown()
+        llm.HAS_OPENAI, llm.OPENAI_API_KEY, llm._client, llm.RESPONSE_CACHE, base_url = self.saved
+        if base_url is None:
+            os.environ.pop("OPENAI_BASE_URL", None)
+        else:
+            os.environ["OPENAI_BASE_URL"] = base_url
+
+    def test_late_first_byte(self):
+        start = time.perf_counter()
+        events = list(analyze_stream(DECISION, deadline=0.5))
+        self.assertLess(time.perf_counter() - start, 1.2)
+        self.assertEqual(events[-1][1].llm_error, deadline_message(0.5))
+        self.assertEqual(self.server.behavior.requests, 1)  # no retry
+
+if __name__ == "__main__":
+    unittest.main()
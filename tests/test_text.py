@@ -0,0 +1,37 @@
+import random
+import unittest
+
+from disagree.text import KEYWORD_GROUPS, analyze_text, contains_any, count_numbers
+
+def naive_hits(text):
+    return {group for group, keywords in KEYWORD_GROUPS.items() if contains_any(text, keywords)}
+
+class MatcherTest(unittest.TestCase):
+    def test_matches_contains_any(self):
+        rng = random.Random(7)
+        keywords = [k for ks in KEYWORD_GROUPS.values() for k in ks]
+        filler = ["we", "plan", "the", "no", "a", "in", "q3", "to", "risk", "$", "-", "ing", "s"]
+        for _ in range(3000):
+            words = rng.choices(keywords + filler, k=rng.randint(0, 12))
+            # Joining without spaces sometimes glues words into substrings of other keywords.
+            text = rng.choice([" ", "", ", "]).join(words)
+            if rng.random() < 0.3:
+                text = text.upper()
+            self.assertEqual(analyze_text(text).hits, naive_hits(text), text)
+
+    def test_every_keyword_fires_its_groups(self):
+        for group, keywords in KEYWORD_GROUPS.items():
+            for keyword in keywords:
+                self.assertIn(group, analyze_text(f"so, {keyword}!").hits, keyword)
+
+    def test_curly_quotes_match_straight_keywords(self):
+        text = "We can’t fail"
+        self.assertEqual(analyze_text(text).hits, naive_hits(text.replace("’", "'")))
+
+class CountNumbersTest(unittest.TestCase):
+    def test_matches_analyzed_numbers(self):
+        for text in ("", None, "Ship in 3 weeks for $1.5M", "Q3 2025: 12% of 40k users", "v2.0.1 and 7,000"):
+            self.assertEqual(count_numbers(text), len(analyze_text(text).numbers), text)
+
+if __name__ == "__main__":
+    unittest.main()